@@ -4,13 +4,16 @@ from typing import TYPE_CHECKING, Optional, Tuple
 
 import colour
 import exceptions
+from slotted import Slotted
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Actor, Entity, Item
 
 
-class Action:
+class Action(Slotted):
+    __slots__ = ('entity',)
+
     def __init__(self, entity: Actor) -> None:
         super().__init__()
         self.entity = entity
@@ -44,17 +47,16 @@ class PickupAction(Action):
         actor_location_y = self.entity.y
         inventory = self.entity.inventory
 
-        for item in self.engine.game_map.items:
-            if actor_location_x == item.x and actor_location_y == item.y:
-                if len(inventory.items) >= inventory.capacity:
-                    raise exceptions.Impossible('Your inventory is full!')
+        for item in self.engine.game_map.get_items_at_location(actor_location_x, actor_location_y):
+            if len(inventory.items) >= inventory.capacity:
+                raise exceptions.Impossible('Your inventory is full!')
 
-                self.engine.game_map.entities.remove(item)
-                item.parent = self.entity.inventory
-                inventory.items.append(item)
+            self.engine.game_map.remove_entity(item)
+            item.parent = self.entity.inventory
+            inventory.items.append(item)
 
-                self.engine.message_log.add_message(f'You picked up the {item.name}!')
-                return
+            self.engine.message_log.add_message(f'You picked up the {item.name}!')
+            return
 
         raise exceptions.Impossible('There is no item here to pickup.')
 
@@ -106,11 +108,15 @@ class TakeStairsAction(Action):
         """
         Take the stairs, if any exist at the entity's location.
         """
-        if (self.entity.x, self.entity.y) == self.engine.game_map.downstairs_location:
-            self.engine.game_world.generate_floor()
-            self.engine.message_log.add_message(
-                'You descend the stairs and the trapdoor closes behind you', colour.descend
-            )
+        game_world = self.engine.game_world
+        location = (self.entity.x, self.entity.y)
+
+        if location == self.engine.game_map.downstairs_location:
+            game_world.change_floor(game_world.current_floor + 1)
+            self.engine.message_log.add_message('You descend the stairs', colour.descend)
+        elif location == self.engine.game_map.upstairs_location:
+            game_world.change_floor(game_world.current_floor - 1)
+            self.engine.message_log.add_message('You climb back up the stairs', colour.ascend)
         else:
             raise exceptions.Impossible('There are no stairs here to take!')
 
@@ -167,18 +173,9 @@ class MovementAction(ActionWithDirection):
     def perform(self) -> None:
         dest_x, dest_y = self.dest_xy
 
-        # Double check walkable and in bounds
-        if not self.engine.game_map.in_bounds(dest_x, dest_y):
-            # Destination is out of bounds
-            raise exceptions.Impossible('This way is blocked!')
-
-        if not self.engine.game_map.tiles['walkable'][dest_x, dest_y]:
-            # Destination is blocked by a tile
-            raise exceptions.Impossible('This way is blocked!')
-
-        # Safeguard, should never be triggered due to other criteria
-        if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
-            # Destination is blocked by an enemy
+        # Double check in bounds, the blocked layer then covers both
+        # unwalkable tiles and blocking entities
+        if not self.engine.game_map.in_bounds(dest_x, dest_y) or self.engine.game_map.blocked[dest_x, dest_y]:
             raise exceptions.Impossible('This way is blocked!')
 
         self.entity.move(self.dx, self.dy)
@@ -0,0 +1,157 @@
+"""
+Columnar store of the actors on a map
+
+Every actor on a GameMap has a row in the maps ActorStore, holding its
+position, hp, max hp, base defense and base power in one NumPy array
+per column. While the actor is on the map its row is where those values
+live: Actor.x and y and the Fighter stats are properties that read and
+write the row (see Actor.write_column), so bulk operations over every
+actor on the map, like finding who is caught in a fireball (see
+queries.py), are a few array expressions over the only copy there is.
+
+Rows are handed out as actors are added to the map and given back when
+they leave it, at which point the values are copied back onto the Actor
+and Fighter, which keep them while the actor has no row. Actors that
+aren't on a map, like a player built from its template in
+entity_factories before the first floor exists, have no row. Rows where
+in_use is False are gaps waiting to be reused.
+
+The alive column follows Actor.ai, which as an object can't be a column
+itself, and is set whenever the ai is.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+# The int columns, named after the Actor or Fighter attribute they hold
+COLUMNS = ('x', 'y', 'hp', 'max_hp', 'base_defense', 'base_power')
+
+
+class ActorStore:
+    def __init__(self, capacity: int = 16):
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.max_hp = np.zeros(capacity, dtype=np.int32)
+        self.base_defense = np.zeros(capacity, dtype=np.int32)
+        self.base_power = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.in_use = np.zeros(capacity, dtype=bool)
+
+        # Row -> actor, the actor knows its own row as Actor.row
+        self.actors: List[Actor | None] = [None] * capacity
+
+        # Unused rows, taken from the end so the lowest rows are used first
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return self.capacity - len(self.free)
+
+    def __contains__(self, actor: Actor) -> bool:
+        return actor.store is self
+
+    @property
+    def capacity(self) -> int:
+        return len(self.actors)
+
+    def grow(self) -> None:
+        """Double the number of rows"""
+        capacity = self.capacity
+        for name in (*COLUMNS, 'alive', 'in_use'):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+        self.actors.extend([None] * capacity)
+        self.free[:0] = range(2 * capacity - 1, capacity - 1, -1)
+
+    def add(self, actor: Actor) -> None:
+        """Give an actor a row, moving its values off the objects and into it"""
+        if actor.store is self:
+            return
+        if actor.store is not None:
+            # Still in the store of a map it's being moved off
+            actor.store.remove(actor)
+        if not self.free:
+            self.grow()
+
+        row = self.free.pop()
+        fighter = actor.fighter
+        self.x[row] = actor.x
+        self.y[row] = actor.y
+        self.hp[row] = fighter.hp
+        self.max_hp[row] = fighter.max_hp
+        self.base_defense[row] = fighter.base_defense
+        self.base_power[row] = fighter.base_power
+        self.alive[row] = actor.is_alive
+        self.in_use[row] = True
+        self.actors[row] = actor
+
+        # From here on the row is what the actor reads and writes
+        actor.store, actor.row = self, row
+
+    def remove(self, actor: Actor) -> None:
+        """Give an actors row back, moving its values back onto the objects"""
+        if actor.store is not self:
+            return
+        row = actor.row
+        values = {name: getattr(self, name).item(row) for name in COLUMNS}
+
+        actor.store, actor.row = None, -1
+        actor.x, actor.y = values['x'], values['y']
+        # Straight to the fighters own slots, as hp reaching 0 here isn't a death
+        fighter = actor.fighter
+        fighter._hp = values['hp']
+        fighter._max_hp = values['max_hp']
+        fighter._base_defense = values['base_defense']
+        fighter._base_power = values['base_power']
+
+        self.actors[row] = None
+        self.in_use[row] = False
+        self.alive[row] = False
+        self.free.append(row)
+
+    @property
+    def living(self) -> np.ndarray:
+        """True for the rows of living actors"""
+        return self.in_use & self.alive
+
+    def select(self, mask: np.ndarray) -> List[Actor]:
+        """Return the actors of the rows where mask is True, in row order"""
+        return [self.actors[row] for row in np.flatnonzero(mask).tolist()]  # type: ignore[misc]
+
+    def living_actors(self) -> List[Actor]:
+        return self.select(self.living)
+
+    def distance_squared(self, x: int, y: int) -> np.ndarray:
+        """Squared distance from (x, y) to every row"""
+        return (self.x - x) ** 2 + (self.y - y) ** 2
+
+    def damage(self, actors: Iterable[Actor], amount: int) -> List[Actor]:
+        """
+        Take the same damage from many actors at once and return those it kills
+
+        The new hp is worked out and written over the rows together, so
+        nobody dies before everyone is hit, then the dead are swept up with
+        sweep_dead.
+        """
+        actors = list(actors)
+        rows = np.array([actor.row for actor in actors], dtype=np.intp)
+        self.hp[rows] = np.clip(self.hp[rows] - amount, 0, self.max_hp[rows])
+
+        # Flag them for the journal, as writing the column directly doesn't
+        for actor in actors:
+            actor.gamemap.mark_changed(actor)
+
+        return self.sweep_dead()
+
+    def sweep_dead(self) -> List[Actor]:
+        """Run death for every actor still alive with no hp left and return them"""
+        dead = self.select(self.living & (self.hp == 0))
+        for actor in dead:
+            actor.fighter.die()
+        return dead
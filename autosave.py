@@ -0,0 +1,123 @@
+"""
+Periodic autosave that doesn't block the game loop
+
+The engine is pickled on the main thread, which gives a consistent
+snapshot of the game at the end of a turn. A worker pickling it would
+see the game change under it, and copying the engine for the worker
+costs as much as pickling it. Compressing the pickle and writing the
+file then happens on a worker thread while play carries on. In journal
+mode only what changed since the last autosave is captured, see
+journal.py.
+"""
+
+from __future__ import annotations
+
+import pickle
+import threading
+from typing import TYPE_CHECKING
+
+import input_handlers
+import save_codecs
+from journal import SaveJournal
+from message_log import remove_stale_archives
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+
+class Autosaver:
+    def __init__(
+        self,
+        filename: str,
+        interval: int = 25,
+        codec: str = save_codecs.DEFAULT_CODEC,
+        journal: bool = False,
+    ):
+        """
+        Args:
+            filename (str): Save file to write
+            interval (int): Turns between autosaves
+            codec (str): Save codec, see save_codecs
+            journal (bool): Append only what changed to a journal beside
+                the save instead of rewriting the whole game each time
+        """
+        self.filename = filename
+        self.interval = interval
+        self.codec = codec
+        self.journal = SaveJournal(filename, codec) if journal else None
+
+        self.thread: threading.Thread | None = None
+        self.cancelled = False
+        # Held while a finished save replaces the file, so cancel can't race it
+        self.lock = threading.Lock()
+
+        self.engine: Engine | None = None
+        self.last_turn = 0
+
+    @property
+    def busy(self) -> bool:
+        """True while the previous autosave is still being written"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def update(self, handler: input_handlers.BaseEventHandler) -> None:
+        """Call once per frame, autosaves when enough turns have passed"""
+        if not isinstance(handler, input_handlers.EventHandler):
+            return
+
+        engine = handler.engine
+        if engine is not self.engine:
+            # A new or loaded game, count from where it is now
+            self.engine = engine
+            self.last_turn = engine.turn
+            return
+
+        # Never save a finished game, it is deleted on quitting
+        if not engine.player.is_alive or engine.turn - self.last_turn < self.interval:
+            return
+
+        if self.save(engine):
+            self.last_turn = engine.turn
+
+    def save(self, engine: Engine) -> bool:
+        """
+        Snapshot the engine and write it in the background
+
+        Returns False without saving if the last autosave is still being
+        written, the next one will be tried later.
+        """
+        if self.busy:
+            return False
+
+        pending: save_codecs.PendingSave
+        if self.journal is not None:
+            pending = self.journal.record(engine)
+        else:
+            pending = save_codecs.SnapshotSave(self.filename, pickle.dumps(engine), self.codec)
+
+        self.cancelled = False
+        self.thread = threading.Thread(
+            target=self.write, args=(pending, engine.message_log.archive_path), name='autosave', daemon=True
+        )
+        self.thread.start()
+        return True
+
+    def write(self, pending: save_codecs.PendingSave, archive_path: str | None) -> None:
+        """Compress and write a save, run on the worker thread"""
+        pending.encode()
+
+        with self.lock:
+            if not self.cancelled:
+                pending.commit()
+                # Earlier games' message archives went with the save replaced
+                remove_stale_archives(self.filename, archive_path)
+
+    def wait(self) -> None:
+        """Block until the autosave being written, if any, is done"""
+        if self.thread is not None:
+            self.thread.join()
+
+    def cancel(self) -> None:
+        """Drop the autosave being written, if any, so it won't replace the save file"""
+        with self.lock:
+            self.cancelled = True
+        self.wait()
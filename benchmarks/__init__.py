@@ -0,0 +1,14 @@
+"""
+Benchmarks for the game systems
+
+Run them all against the default scenarios with:
+
+    python -m benchmarks --output results.json
+
+and check a later run against it, failing on anything 10% slower:
+
+    python -m benchmarks --baseline results.json --threshold 0.1
+"""
+
+# Import the benchmark modules so they register themselves
+from benchmarks import core, fov_bench, memory_bench, query_bench, spawn_bench  # noqa: F401
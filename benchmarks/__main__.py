@@ -0,0 +1,61 @@
+"""Command line entry point, see `python -m benchmarks --help`."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from benchmarks import runner
+from benchmarks.scenarios import parse_size, scenario_grid
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the game systems.')
+    parser.add_argument(
+        '--only', default=None, help=f'comma separated benchmarks to run, from: {", ".join(runner.BENCHMARKS)}'
+    )
+    parser.add_argument('--sizes', default='80x43,200x200', help='comma separated map sizes, WIDTHxHEIGHT')
+    parser.add_argument('--densities', default='0,0.02', help='comma separated extra monsters per walkable tile')
+    parser.add_argument('--floors', default='1,6', help='comma separated dungeon floors')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed slow down against the baseline')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(runner.BENCHMARKS)
+    unknown = [name for name in names if name not in runner.BENCHMARKS]
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(unknown)}')
+
+    scenarios = scenario_grid(
+        sizes=[parse_size(size) for size in args.sizes.split(',')],
+        densities=[float(density) for density in args.densities.split(',')],
+        floors=[int(floor) for floor in args.floors.split(',')],
+    )
+
+    results = runner.run(names, scenarios, repeat=args.repeat)
+
+    for key, result in results['results'].items():
+        extra = ' '.join(f'{name}={value}' for name, value in result['extra'].items())
+        print(  # noqa: T201
+            f'{key:<45} median {result["median"] * 1000:10.3f} ms  min {result["min"] * 1000:10.3f} ms  {extra}'
+        )
+
+    if args.output:
+        runner.save(results, args.output)
+
+    if not args.baseline:
+        return 0
+
+    rows = runner.compare(results, runner.load(args.baseline), args.threshold)
+    print()  # noqa: T201
+    for row in rows:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(f'{row["key"]:<45} {row["ratio"]:6.2f}x baseline {flag}')  # noqa: T201
+
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
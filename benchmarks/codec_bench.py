@@ -0,0 +1,89 @@
+"""
+Compare the save codecs against a game
+
+Reports save time, load time and file size for every codec, using the
+current save game if there is one or a freshly generated game if not.
+Load time is decoding and unpickling the save, without starting the
+pregeneration of the next floor that loading a game to play does:
+
+    python -m benchmarks.codec_bench savegame.sav
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pickle
+import statistics
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import save_codecs
+import setup_game
+from benchmarks.scenarios import Scenario
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+DEFAULT_CODECS = ['none', 'zlib:1', 'zlib:6', 'zlib:9', 'bz2:1', 'bz2:9', 'lzma:0', 'lzma:3', 'lzma:6', 'lzma:9']
+
+
+def bench_codecs(engine: Engine, codecs: List[str], repeat: int = 3) -> List[Dict[str, Any]]:
+    """Time saving and loading an engine with each codec"""
+    filename = os.path.join(tempfile.mkdtemp(), 'codec.sav')
+    results = []
+
+    for codec in codecs:
+        save_times = []
+        load_times = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine.save_as(filename, codec=codec)
+            save_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with open(filename, 'rb') as f:
+                pickle.loads(save_codecs.decode(f.read()))  # noqa: S301
+            load_times.append(time.perf_counter() - start)
+
+        results.append(
+            {
+                'codec': codec,
+                'save': statistics.median(save_times),
+                'load': statistics.median(load_times),
+                'bytes': os.path.getsize(filename),
+            }
+        )
+
+    os.remove(filename)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.codec_bench', description=__doc__.splitlines()[1])
+    parser.add_argument('save', nargs='?', default='savegame.sav', help='save game to benchmark with')
+    parser.add_argument('--codecs', default=','.join(DEFAULT_CODECS), help='comma separated codecs to compare')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if os.path.exists(args.save):
+        # No worker process generating a floor while the codecs are timed
+        engine = setup_game.load_game(args.save, pregenerate_floors=False)
+        print(f'Using {args.save}')  # noqa: T201
+    else:
+        engine = Scenario(80, 43).build_engine()
+        print(f'No save at {args.save}, using a new game')  # noqa: T201
+
+    print(f'Uncompressed pickle: {len(pickle.dumps(engine))} bytes\n')  # noqa: T201
+    print(f'{"codec":<10} {"save ms":>10} {"load ms":>10} {"bytes":>10}')  # noqa: T201
+
+    for result in bench_codecs(engine, args.codecs.split(','), args.repeat):
+        print(  # noqa: T201
+            f'{result["codec"]:<10} {result["save"] * 1000:10.2f} {result["load"] * 1000:10.2f} {result["bytes"]:10d}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Benchmarks of the main game systems: procgen, FOV, AI turns, rendering and saving."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Dict
+
+import tcod
+
+import setup_game
+from benchmarks.runner import Timed, benchmark
+from benchmarks.scenarios import Scenario
+
+# Size of the console the game draws to
+SCREEN_WIDTH = 80
+SCREEN_HEIGHT = 50
+
+
+@benchmark('procgen')
+def bench_procgen(scenario: Scenario) -> Timed:
+    """Generate this scenarios floor from scratch"""
+    engine = scenario.build_engine()
+    game_world = engine.game_world
+
+    def generate() -> None:
+        game_world.current_floor = scenario.floor - 1
+        game_world.generate_floor()
+
+    return generate
+
+
+@benchmark('fov')
+def bench_fov(scenario: Scenario) -> Timed:
+    """Recompute the players field of view from a position not seen before"""
+    engine = scenario.build_engine()
+
+    def fov() -> None:
+        engine.game_map.fov_cache.clear()
+        engine.update_fov()
+
+    return fov
+
+
+@benchmark('fov_cached')
+def bench_fov_cached(scenario: Scenario) -> Timed:
+    """Update the players field of view without having moved, e.g. after waiting"""
+    return scenario.build_engine().update_fov
+
+
+@benchmark('enemy_turns')
+def bench_enemy_turns(scenario: Scenario) -> Timed:
+    """One round of enemy turns with every monster able to see the player"""
+    engine = scenario.build_engine()
+
+    def enemy_turns() -> Dict[str, int]:
+        # Everything in view means every hostile chases the player
+        engine.game_map.visible[:] = True
+        engine.handle_enemy_turns()
+        return {'pathfinder_calls': engine.pathfinder_calls}
+
+    return enemy_turns
+
+
+@benchmark('render')
+def bench_render(scenario: Scenario) -> Timed:
+    """Draw a frame into an off-screen console the size of the game window"""
+    engine = scenario.build_engine()
+    console = tcod.console.Console(SCREEN_WIDTH, SCREEN_HEIGHT, order='F')
+
+    def render() -> None:
+        console.clear()
+        engine.render(console)
+
+    return render
+
+
+@benchmark('save')
+def bench_save(scenario: Scenario) -> Timed:
+    """Save the game, reporting the file size"""
+    engine = scenario.build_engine()
+    filename = os.path.join(tempfile.mkdtemp(), 'bench.sav')
+
+    def save() -> Dict[str, int]:
+        engine.save_as(filename)
+        return {'bytes': os.path.getsize(filename)}
+
+    return save
+
+
+@benchmark('load')
+def bench_load(scenario: Scenario) -> Timed:
+    """Load a saved game"""
+    engine = scenario.build_engine()
+    filename = os.path.join(tempfile.mkdtemp(), 'bench.sav')
+    engine.save_as(filename)
+
+    def load() -> None:
+        setup_game.load_game(filename)
+
+    return load
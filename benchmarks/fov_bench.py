@@ -0,0 +1,84 @@
+"""
+FOV algorithms compared against each other, see fov.py
+
+For every algorithm in fov.ALGORITHMS this registers:
+
+    fov_<name>             the players FOV as the game computes it, on a
+                           window around the player with no cached result
+    fov_<name>_full        the players FOV over the whole map
+    fov_<name>_all_actors  the FOV of every actor on the map, in one call
+                           to fov.batch for the rays algorithm
+
+so the fastest algorithm can be picked per map size:
+
+    python -m benchmarks --only fov_tcod,fov_rays,fov_tcod_all_actors,fov_rays_all_actors
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+import fov
+from benchmarks.runner import Setup, Timed, benchmark
+from benchmarks.scenarios import Scenario
+
+
+def game_fov(algorithm: str) -> Setup:
+    def setup(scenario: Scenario) -> Timed:
+        engine = scenario.build_engine()
+        engine.fov_algorithm = algorithm
+
+        def update_fov() -> None:
+            engine.game_map.fov_cache.clear()
+            engine.update_fov()
+
+        return update_fov
+
+    setup.__doc__ = f'The players FOV with {algorithm}, uncached'
+    return setup
+
+
+def full_fov(algorithm: str) -> Setup:
+    def setup(scenario: Scenario) -> Timed:
+        engine = scenario.build_engine()
+        transparent = engine.game_map.transparent
+        pov = engine.player.x, engine.player.y
+        radius = engine.player.vision_radius
+
+        def compute() -> None:
+            fov.compute(transparent, pov, radius, algorithm)
+
+        return compute
+
+    setup.__doc__ = f'The players FOV with {algorithm} over the whole map'
+    return setup
+
+
+def all_actors_fov(algorithm: str) -> Setup:
+    def setup(scenario: Scenario) -> Timed:
+        engine = scenario.build_engine()
+        game_map = engine.game_map
+        actors = list(game_map.actors)
+        povs = np.array([(actor.x, actor.y) for actor in actors])
+        radii = np.array([actor.vision_radius for actor in actors])
+
+        def compute_each() -> dict:
+            for actor in actors:
+                game_map.fov_cache.clear()
+                game_map.compute_fov(actor.x, actor.y, actor.vision_radius, algorithm)
+            return {'actors': len(actors)}
+
+        def compute_batch() -> dict:
+            fov.batch(game_map.transparent, povs, radii)
+            return {'actors': len(actors)}
+
+        return compute_batch if algorithm == 'rays' else compute_each
+
+    setup.__doc__ = f'The FOV of every actor with {algorithm}'
+    return setup
+
+
+for name in fov.ALGORITHMS:
+    benchmark(f'fov_{name}')(game_fov(name))
+    benchmark(f'fov_{name}_full')(full_fov(name))
+    benchmark(f'fov_{name}_all_actors')(all_actors_fov(name))
@@ -0,0 +1,169 @@
+"""
+Memory and pickle size of entities and messages
+
+Each run builds MEMORY_COUNT of a kind of object off the map, so neither
+the map nor its actor store is counted, and reports in the extra fields
+how many bytes each one took to hold in memory (from tracemalloc) and to
+pickle. The same objects are then built again as unslotted copies, whose
+classes keep every attribute in a __dict__, for a baseline of what
+__slots__ saves. The times are only how long that took:
+
+    memory_actors    orcs, with all their components
+    memory_corpses   the same orcs after dying
+    memory_items     every item procgen can place
+    memory_messages  distinct messages for the message log
+
+    python -m benchmarks --only memory_actors,memory_items --sizes 80x43 --densities 0 --floors 1
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import gc
+import io
+import pickle
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+import colour
+import entity_factories
+import procgen
+from benchmarks.runner import Timed, benchmark
+from benchmarks.scenarios import Scenario
+from entity import Entity
+from game_map import GameMap
+from message_log import Message
+from slotted import Slotted, slot_names
+
+# Objects built per run
+MEMORY_COUNT = 2000
+
+
+class EntityPickler(pickle.Pickler):
+    """Pickle objects without the map they're on, so only their own size is counted"""
+
+    def persistent_id(self, obj: Any) -> str | None:
+        return 'map' if isinstance(obj, GameMap) else None
+
+
+@functools.cache
+def unslotted_class(cls: type) -> type:
+    """A stand in for a slotted class that keeps its attributes in a __dict__, defined here so it pickles"""
+    name = f'Unslotted{cls.__name__}'
+    unslotted = type(name, (), {'__module__': __name__, '__qualname__': name})
+    globals()[name] = unslotted
+    return unslotted
+
+
+def unslotted(obj: Any, memo: Dict[int, Any] | None = None) -> Any:
+    """Copy an object, and the slotted objects it refers to, as instances of their unslotted classes"""
+    if memo is None:
+        memo = {}
+    if id(obj) in memo:
+        return memo[id(obj)]
+
+    if isinstance(obj, (Slotted, Message)):
+        result = unslotted_class(type(obj))()
+        memo[id(obj)] = result
+        for name in slot_names(type(obj)):
+            if hasattr(obj, name):
+                setattr(result, name, unslotted(getattr(obj, name), memo))
+        return result
+    if isinstance(obj, (list, deque)):
+        return type(obj)(unslotted(item, memo) for item in obj)
+    # Everything else is immutable or shared, e.g. tuples and enums
+    return obj
+
+
+def measure(build: Callable[[], List[Any]]) -> Dict[str, float]:
+    """Bytes per object allocated by build and taken to pickle what it returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objects = build()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    pickled = io.BytesIO()
+    EntityPickler(pickled).dump(objects)
+    return {
+        'bytes_each': round(allocated / len(objects), 1),
+        'pickled_bytes_each': round(len(pickled.getvalue()) / len(objects), 1),
+    }
+
+
+def measure_memory(build: Callable[[int], Any]) -> Dict[str, float]:
+    """
+    Measure the objects build returns for 0 to MEMORY_COUNT, then unslotted copies of them
+
+    The saved fields are how many bytes each the unslotted copies take
+    more than the slotted objects.
+    """
+    slotted = measure(lambda: [build(i) for i in range(MEMORY_COUNT)])
+    baseline = measure(lambda: [unslotted(build(i)) for i in range(MEMORY_COUNT)])
+    return {
+        **slotted,
+        **{f'unslotted_{key}': value for key, value in baseline.items()},
+        'saved_bytes_each': round(baseline['bytes_each'] - slotted['bytes_each'], 1),
+        'saved_pickled_bytes_each': round(baseline['pickled_bytes_each'] - slotted['pickled_bytes_each'], 1),
+    }
+
+
+def off_map(entity: Entity) -> Entity:
+    """Take an entity off its map, so copies of it don't copy the map too"""
+    entity.gamemap.remove_entity(entity)
+    del entity.parent
+    return entity
+
+
+def item_templates() -> List[Any]:
+    """Every item procgen can place"""
+    return list(dict.fromkeys(template for entries in procgen.item_chances.values() for template, _ in entries))
+
+
+@benchmark('memory_actors')
+def bench_memory_actors(scenario: Scenario) -> Timed:
+    """Memory taken by each orc"""
+
+    def memory_actors() -> Dict[str, float]:
+        return measure_memory(lambda i: entity_factories.orc.build())
+
+    return memory_actors
+
+
+@benchmark('memory_corpses')
+def bench_memory_corpses(scenario: Scenario) -> Timed:
+    """Memory taken by each dead orc"""
+    game_map = scenario.build_engine().game_map
+    corpse = entity_factories.orc.spawn(game_map, *game_map.rooms[0].center)
+    corpse.fighter.die()
+    off_map(corpse)
+
+    def memory_corpses() -> Dict[str, float]:
+        return measure_memory(lambda i: copy.deepcopy(corpse))
+
+    return memory_corpses
+
+
+@benchmark('memory_items')
+def bench_memory_items(scenario: Scenario) -> Timed:
+    """Memory taken by each item"""
+    templates = item_templates()
+
+    def memory_items() -> Dict[str, float]:
+        return measure_memory(lambda i: templates[i % len(templates)].build())
+
+    return memory_items
+
+
+@benchmark('memory_messages')
+def bench_memory_messages(scenario: Scenario) -> Timed:
+    """Memory taken by each message"""
+
+    def memory_messages() -> Dict[str, float]:
+        return measure_memory(lambda i: Message(f'Message number {i}', colour.white))
+
+    return memory_messages
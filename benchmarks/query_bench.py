@@ -0,0 +1,122 @@
+"""
+Area of effect and nearest target queries, see queries.py
+
+Each scenario is filled up to ACTOR_COUNT orcs so the queries are timed
+against a crowded map, next to the loop over the actors they replaced:
+
+    actors_within       actors in a fireball sized radius of the player
+    actors_within_loop  the same, measuring the distance to each actor
+    nearest_actor       nearest visible actor, as the lightning scroll picks
+    nearest_actor_loop  the same, measuring the distance to each actor
+    blast_cells         tiles covered by a fireball sized blast
+
+    python -m benchmarks --only actors_within,actors_within_loop --sizes 200x200
+"""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
+
+import entity_factories
+import queries
+from benchmarks.runner import Timed, benchmark
+from benchmarks.scenarios import Scenario
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+# Actors on the map for every query benchmark
+ACTOR_COUNT = 10_000
+
+# Fireball and lightning scroll ranges, from entity_factories
+BLAST_RADIUS = 3
+LIGHTNING_RANGE = 5
+
+
+def crowded_engine(scenario: Scenario) -> Engine:
+    """Build the scenarios engine and spawn orcs on random walkable tiles up to ACTOR_COUNT"""
+    engine = scenario.build_engine()
+    game_map = engine.game_map
+
+    walkable_x, walkable_y = np.nonzero(game_map.walkable)
+    for _ in range(ACTOR_COUNT - len(game_map.actor_store)):
+        i = random.randrange(len(walkable_x))  # noqa: S311
+        entity_factories.orc.spawn(game_map, int(walkable_x[i]), int(walkable_y[i]))
+
+    # Everything in view so the nearest actor query has the most to check
+    game_map.visible[:] = True
+    return engine
+
+
+@benchmark('actors_within')
+def bench_actors_within(scenario: Scenario) -> Timed:
+    """Find the actors in a fireball sized radius of the player"""
+    engine = crowded_engine(scenario)
+    player = engine.player
+
+    def actors_within() -> Dict[str, int]:
+        hit = queries.actors_within(engine.game_map, player.x, player.y, BLAST_RADIUS)
+        return {'actors': len(engine.game_map.actor_store), 'hit': len(hit)}
+
+    return actors_within
+
+
+@benchmark('actors_within_loop')
+def bench_actors_within_loop(scenario: Scenario) -> Timed:
+    """Find the actors in a fireball sized radius of the player by measuring the distance to each"""
+    engine = crowded_engine(scenario)
+    player = engine.player
+
+    def actors_within_loop() -> Dict[str, int]:
+        hit = [actor for actor in engine.game_map.actors if actor.distance(player.x, player.y) <= BLAST_RADIUS]
+        return {'actors': len(engine.game_map.actor_store), 'hit': len(hit)}
+
+    return actors_within_loop
+
+
+@benchmark('nearest_actor')
+def bench_nearest_actor(scenario: Scenario) -> Timed:
+    """Find the nearest visible actor to the player within lightning range"""
+    engine = crowded_engine(scenario)
+    player = engine.player
+
+    def nearest_actor() -> Dict[str, bool]:
+        target = queries.nearest_visible_actor(engine.game_map, player.x, player.y, LIGHTNING_RANGE, exclude=player)
+        return {'found': target is not None}
+
+    return nearest_actor
+
+
+@benchmark('nearest_actor_loop')
+def bench_nearest_actor_loop(scenario: Scenario) -> Timed:
+    """Find the nearest visible actor to the player by measuring the distance to each"""
+    engine = crowded_engine(scenario)
+    game_map = engine.game_map
+    player = engine.player
+
+    def nearest_actor_loop() -> Dict[str, bool]:
+        target = None
+        closest_distance = LIGHTNING_RANGE + 1.0
+        for actor in game_map.actors:
+            if actor is not player and game_map.visible[actor.x, actor.y]:
+                distance = player.distance(actor.x, actor.y)
+                if distance < closest_distance:
+                    target, closest_distance = actor, distance
+        return {'found': target is not None}
+
+    return nearest_actor_loop
+
+
+@benchmark('blast_cells')
+def bench_blast_cells(scenario: Scenario) -> Timed:
+    """Find the tiles a fireball sized blast on the player would cover"""
+    engine = scenario.build_engine()
+    player = engine.player
+
+    def blast_cells() -> None:
+        queries.blast_cells(engine.game_map, player.x, player.y, BLAST_RADIUS)
+
+    return blast_cells
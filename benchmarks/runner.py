@@ -0,0 +1,127 @@
+"""
+Register, time and compare benchmarks
+
+Benchmarks register a setup function with the `benchmark` decorator. The
+setup is given a Scenario and returns the callable to time, so building
+the game state is never part of the measurement. If the timed callable
+returns a dict it is stored alongside the timings as extra metrics, e.g.
+the size of a save file.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.scenarios import Scenario
+
+Timed = Callable[[], Any]
+Setup = Callable[[Scenario], Timed]
+
+# Name -> setup function of every registered benchmark
+BENCHMARKS: Dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Register a benchmark setup function under a name"""
+
+    def decorator(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def measure(func: Timed, repeat: int) -> Tuple[List[float], Any]:
+    """Call func once to warm up, then time it `repeat` times"""
+    func()
+
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    return timings, result
+
+
+def run(names: List[str], scenarios: List[Scenario], repeat: int = 5) -> Dict[str, Any]:
+    """
+    Run each named benchmark against every scenario
+
+    Returns:
+        Dict[str, Any]: JSON ready results keyed by 'benchmark[scenario]'
+    """
+    results: Dict[str, Any] = {}
+
+    for name in names:
+        setup = BENCHMARKS[name]
+        for scenario in scenarios:
+            timings, extra = measure(setup(scenario), repeat)
+
+            results[f'{name}[{scenario.name}]'] = {
+                'benchmark': name,
+                'scenario': scenario.as_dict(),
+                'repeat': repeat,
+                'min': min(timings),
+                'median': statistics.median(timings),
+                'mean': statistics.fmean(timings),
+                'extra': extra if isinstance(extra, dict) else {},
+            }
+
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def save(results: Dict[str, Any], filename: str) -> None:
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load(filename: str) -> Dict[str, Any]:
+    with open(filename) as f:
+        return json.load(f)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare median timings against a baseline run
+
+    Args:
+        threshold (float): Allowed slow down as a fraction, 0.1 flags
+            anything more than 10% slower than the baseline
+
+    Returns:
+        List[Dict[str, Any]]: One row per benchmark in both runs, with
+        its ratio to the baseline and whether it regressed
+    """
+    rows = []
+
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None or base['median'] == 0:
+            continue
+
+        ratio = result['median'] / base['median']
+        rows.append(
+            {
+                'key': key,
+                'baseline': base['median'],
+                'current': result['median'],
+                'ratio': ratio,
+                'regression': ratio > 1 + threshold,
+            }
+        )
+
+    return rows
@@ -0,0 +1,105 @@
+"""
+Scenarios the benchmarks are run against
+
+A scenario is a map size, a monster density and a floor depth. Each one
+builds a fresh headless Engine so no window or tileset is needed.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+import entity_factories
+import setup_game
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+# Area of the default 80x43 map, room counts scale with map area from here
+BASE_AREA = 80 * 43
+BASE_MAX_ROOMS = 30
+
+
+class Scenario:
+    def __init__(self, map_width: int, map_height: int, monster_density: float = 0.0, floor: int = 1):
+        """
+        Args:
+            map_width (int): Width of the dungeon
+            map_height (int): Height of the dungeon
+            monster_density (float): Extra orcs per walkable tile, on top
+                of what procgen places for the floor
+            floor (int): Dungeon level to generate, deeper floors spawn
+                more and tougher monsters and items
+        """
+        self.map_width = map_width
+        self.map_height = map_height
+        self.monster_density = monster_density
+        self.floor = floor
+
+    @property
+    def name(self) -> str:
+        return f'{self.map_width}x{self.map_height}-d{self.monster_density:g}-f{self.floor}'
+
+    @property
+    def max_rooms(self) -> int:
+        """Keep the room density of the default map as the map grows"""
+        return max(BASE_MAX_ROOMS, BASE_MAX_ROOMS * self.map_width * self.map_height // BASE_AREA)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'map_width': self.map_width,
+            'map_height': self.map_height,
+            'monster_density': self.monster_density,
+            'floor': self.floor,
+        }
+
+    def build_engine(self, seed: int = 0) -> Engine:
+        """Return a new headless game on this scenarios floor, with extra monsters spawned in"""
+        random.seed(seed)
+
+        engine = setup_game.new_game(map_width=self.map_width, map_height=self.map_height, max_rooms=self.max_rooms)
+
+        # Generating jumps to the next floor, so start one above
+        if self.floor > 1:
+            engine.game_world.current_floor = self.floor - 1
+            engine.game_world.generate_floor()
+
+        self.populate(engine)
+
+        # Keep the player alive however long the benchmark runs
+        engine.player.fighter.base_defense = 1000
+
+        engine.update_fov()
+        return engine
+
+    def populate(self, engine: Engine) -> None:
+        """Spawn orcs on random free walkable tiles to reach the monster density"""
+        game_map = engine.game_map
+
+        free_x, free_y = np.nonzero(~game_map.blocked)
+        count = min(len(free_x), int(len(free_x) * self.monster_density))
+
+        for i in random.sample(range(len(free_x)), count):
+            entity_factories.orc.spawn(game_map, int(free_x[i]), int(free_y[i]))
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    """Parse a size given as WIDTHxHEIGHT"""
+    width, height = size.lower().split('x')
+    return int(width), int(height)
+
+
+def scenario_grid(
+    sizes: Iterable[Tuple[int, int]],
+    densities: Iterable[float],
+    floors: Iterable[int],
+) -> List[Scenario]:
+    """Every combination of the given map sizes, monster densities and floors"""
+    return [
+        Scenario(width, height, density, floor)
+        for (width, height), density, floor in itertools.product(sizes, densities, floors)
+    ]
@@ -0,0 +1,65 @@
+"""
+Spawning entities from the templates in entity_factories, see template.py
+
+    spawn           build and place SPAWN_COUNT of each monster and item
+    spawn_deepcopy  the same by deep copying a prototype of each, the
+                    way entities were spawned before templates
+
+    python -m benchmarks --only spawn,spawn_deepcopy
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Dict
+
+import procgen
+from benchmarks.runner import Timed, benchmark
+from benchmarks.scenarios import Scenario
+
+# Entities spawned of each kind per run
+SPAWN_COUNT = 200
+
+# Everything procgen can spawn
+TEMPLATES = list(
+    dict.fromkeys(
+        template
+        for chances in (procgen.enemy_chances, procgen.item_chances)
+        for entries in chances.values()
+        for template, _ in entries
+    )
+)
+
+
+@benchmark('spawn')
+def bench_spawn(scenario: Scenario) -> Timed:
+    """Spawn every monster and item procgen can place, from their templates"""
+    game_map = scenario.build_engine().game_map
+    x, y = game_map.rooms[0].center
+
+    def spawn() -> Dict[str, int]:
+        for template in TEMPLATES:
+            for _ in range(SPAWN_COUNT):
+                template.spawn(game_map, x, y)
+        return {'spawned': SPAWN_COUNT * len(TEMPLATES)}
+
+    return spawn
+
+
+@benchmark('spawn_deepcopy')
+def bench_spawn_deepcopy(scenario: Scenario) -> Timed:
+    """Spawn every monster and item procgen can place, by deep copying a prototype of each"""
+    game_map = scenario.build_engine().game_map
+    x, y = game_map.rooms[0].center
+    prototypes = [template.build() for template in TEMPLATES]
+
+    def spawn_deepcopy() -> Dict[str, int]:
+        for prototype in prototypes:
+            for _ in range(SPAWN_COUNT):
+                clone = copy.deepcopy(prototype)
+                clone.x, clone.y = x, y
+                clone.parent = game_map
+                game_map.add_entity(clone)
+        return {'spawned': SPAWN_COUNT * len(prototypes)}
+
+    return spawn_deepcopy
@@ -0,0 +1,81 @@
+"""
+Camera over the map, so maps can be bigger than the console
+
+The camera shows a viewport sized window of the map, kept centred on a
+point (the player) and clamped so it never shows past the map edges. A
+map smaller than the viewport is drawn from the top left corner.
+
+Everything drawn to the console goes through map_to_screen and anything
+read back from it, like the mouse, through screen_to_map.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from game_map import GameMap, Region
+
+
+class Camera:
+    def __init__(self, width: int, height: int):
+        """
+        Args:
+            width (int): Console columns the map is drawn in
+            height (int): Console rows the map is drawn in
+        """
+        self.width = width
+        self.height = height
+
+        # Map position of the top left corner of the viewport
+        self.x = 0
+        self.y = 0
+
+        # Size of the map being looked at, set by centre_on
+        self.map_width = 0
+        self.map_height = 0
+
+    def centre_on(self, x: int, y: int, game_map: GameMap) -> None:
+        """Move the viewport over a map so x, y is in the middle, without going past its edges"""
+        self.map_width, self.map_height = game_map.width, game_map.height
+        self.x = max(0, min(x - self.width // 2, game_map.width - self.width))
+        self.y = max(0, min(y - self.height // 2, game_map.height - self.height))
+
+    @property
+    def view(self) -> Region:
+        """The region of the map in the viewport"""
+        return (
+            slice(self.x, min(self.x + self.width, self.map_width)),
+            slice(self.y, min(self.y + self.height, self.map_height)),
+        )
+
+    def in_view(self, x: int, y: int) -> bool:
+        """Return True if a map position is in the viewport"""
+        view_x, view_y = self.view
+        return view_x.start <= x < view_x.stop and view_y.start <= y < view_y.stop
+
+    def in_view_mask(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """in_view for arrays of map positions"""
+        view_x, view_y = self.view
+        return (view_x.start <= x) & (x < view_x.stop) & (view_y.start <= y) & (y < view_y.stop)
+
+    def map_to_screen(self, x: int, y: int) -> Tuple[int, int]:
+        """Console position a map position is drawn at"""
+        return x - self.x, y - self.y
+
+    def screen_to_map(self, x: int, y: int) -> Tuple[int, int] | None:
+        """Map position drawn at a console position, None if it's not part of the map"""
+        map_x, map_y = x + self.x, y + self.y
+        if not self.in_view(map_x, map_y):
+            return None
+        return map_x, map_y
+
+    def clamp(self, x: int, y: int) -> Tuple[int, int]:
+        """The map position in the viewport closest to x, y"""
+        view_x, view_y = self.view
+        return (
+            max(view_x.start, min(x, view_x.stop - 1)),
+            max(view_y.start, min(y, view_y.stop - 1)),
+        )
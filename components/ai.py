@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import random
-from typing import TYPE_CHECKING, List, Tuple
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Tuple
 
 import numpy as np
 import tcod
@@ -11,6 +12,18 @@ from actions import Action, BumpAction, MeleeAction, MovementAction, WaitAction
 if TYPE_CHECKING:
     from entity import Actor
 
+# The eight directions an actor can step in
+DIRECTIONS = [
+    (-1, -1),
+    (0, -1),
+    (1, -1),
+    (-1, 0),
+    (1, 0),
+    (-1, 1),
+    (0, 1),
+    (1, 1),
+]
+
 # //TODO: Different pathing for different entities?
 # //TODO: Target could be food or treasure instead of player?? Race to the treasure??
 # //TODO: Terrain could take longer to pass? Water?
@@ -19,11 +32,17 @@ if TYPE_CHECKING:
 class BaseAI(Action):
     entity: Actor
 
+    __slots__ = ()
+
     def perform(self) -> None:
         # return
         raise NotImplementedError()
 
-    def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
+    def changed(self) -> None:
+        """Flag this AIs state as changed for the journal, see journal.py"""
+        self.entity.gamemap.mark_changed(self.entity)
+
+    def get_path_to(self, dest_x: int, dest_y: int) -> Deque[Tuple[int, int]]:
         """
         Compute the path to a target, using a cost based system on how far
         and where to travel
@@ -33,25 +52,13 @@ class BaseAI(Action):
             dest_y (int): Where in the y position entity is going
 
         Returns:
-            List[Tuple[int,int]]: returns the path through list of coord,
-            empty if no path
+            Deque[Tuple[int,int]]: returns the path as a deque of coords to
+            pop steps off the front of, empty if no path
         """
-        # use walkable array from entity and make array of 1 if walkable
-        cost = np.array(self.entity.gamemap.tiles['walkable'], dtype=np.int8)
-
-        for entity in self.entity.gamemap.entities:
-            # Check entity blocking and cost not equal zero (walkable)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
-                # The paths will avoid other entities as now a costly 10 space
-                cost[entity.x, entity.y] += 10
-
-        # Creates a graph from cost array and pass graph to new pathfinder
-        graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
+        # Creates a graph from the maps cost layer and pass graph to new pathfinder
+        graph = tcod.path.SimpleGraph(cost=self.entity.gamemap.cost, cardinal=2, diagonal=3)
         pathfinder = tcod.path.Pathfinder(graph)
+        self.engine.pathfinder_calls += 1
 
         # Start position
         pathfinder.add_root((self.entity.x, self.entity.y))
@@ -60,32 +67,109 @@ class BaseAI(Action):
         path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
 
         # Convert to expected typing
-        return [(index[0], index[1]) for index in path]
+        return deque([(index[0], index[1]) for index in path])
 
 
 class HostileEnemy(BaseAI):
+    __slots__ = ('path', 'path_version', 'last_seen')
+
     def __init__(self, entity: Actor):
         super().__init__(entity)
-        self.path: List[Tuple[int, int]] = []
+        self.path: Deque[Tuple[int, int]] = deque()
+        # The maps movement_version when the path was last found clear, it's
+        # only checked again once something has moved
+        self.path_version = -1
+        # Where the player was last seen, chased down once out of sight
+        self.last_seen: Tuple[int, int] | None = None
 
     def perform(self) -> None:
         target = self.engine.player
-        dx = target.x - self.entity.x
-        dy = target.y - self.entity.y
+        # Read once, an actors position is looked up in the actor store
+        x, y = self.entity.x, self.entity.y
+        dx = target.x - x
+        dy = target.y - y
         distance = max(abs(dx), abs(dy))
 
-        if self.engine.game_map.visible[self.entity.x, self.entity.y]:
+        if self.engine.game_map.visible[x, y]:
             if distance <= 1:
                 return MeleeAction(self.entity, dx, dy).perform()
 
-            self.path = self.get_path_to(target.x, target.y)
+            self.path.clear()
+            self.last_seen = target.x, target.y
+            self.changed()
+
+            step = self.get_step_towards_player()
+            if step:
+                return MovementAction(self.entity, *step).perform()
+
+        elif self.last_seen:
+            # Lost sight of the player so head to where they were last seen
+            self.set_path_to(*self.last_seen)
+            self.last_seen = None
+            self.changed()
+
+        elif self.path and not self.path_is_clear():
+            if self.engine.game_map.blocked[self.path[-1]]:
+                # Someone is standing where the player was last seen
+                self.path.clear()
+            else:
+                # Something moved onto the path, find a way around to the same place
+                self.set_path_to(*self.path[-1])
+            self.changed()
 
         if self.path:
-            dest_x, dest_y = self.path.pop(0)
-            return MovementAction(self.entity, dest_x - self.entity.x, dest_y - self.entity.y).perform()
+            dest_x, dest_y = self.path.popleft()
+            self.changed()
+            return MovementAction(self.entity, dest_x - x, dest_y - y).perform()
 
         return WaitAction(self.entity).perform()
 
+    def set_path_to(self, dest_x: int, dest_y: int) -> None:
+        self.path = self.get_path_to(dest_x, dest_y)
+        self.path_version = self.engine.game_map.movement_version
+
+    def path_is_clear(self) -> bool:
+        """Return True if no tile along the rest of the path has been blocked since it was found"""
+        game_map = self.engine.game_map
+        if self.path_version == game_map.movement_version:
+            return True
+
+        path_x, path_y = np.array(self.path).T
+        if game_map.blocked[path_x, path_y].any():
+            return False
+
+        self.path_version = game_map.movement_version
+        return True
+
+    def get_step_towards_player(self) -> Tuple[int, int] | None:
+        """
+        Step down the engines shared distance field towards the player
+
+        Returns:
+            Tuple[int, int] | None: direction of the neighbour closest to the
+            player that is free to move into, None if there is no better tile
+        """
+        distance = self.engine.player_distance
+        if distance is None:
+            return None
+
+        game_map = self.engine.game_map
+        entity_x, entity_y = self.entity.x, self.entity.y
+        best_distance = distance[entity_x, entity_y]
+        best_step = None
+
+        for dx, dy in DIRECTIONS:
+            x, y = entity_x + dx, entity_y + dy
+            if not game_map.in_bounds(x, y) or distance[x, y] >= best_distance:
+                continue
+            # Walk around other monsters rather than into them
+            if game_map.blocked[x, y]:
+                continue
+            best_distance = distance[x, y]
+            best_step = dx, dy
+
+        return best_step
+
 
 class ConfusedEnemy(BaseAI):
     """
@@ -93,6 +177,8 @@ class ConfusedEnemy(BaseAI):
     If an actor occupies a tile it is randomly moving into, it will attack.
     """
 
+    __slots__ = ('previous_ai', 'turns_remaining')
+
     def __init__(self, entity: Actor, previous_ai: BaseAI | None, turns_remaining: int):
         super().__init__(entity)
 
@@ -106,20 +192,10 @@ class ConfusedEnemy(BaseAI):
             self.entity.ai = self.previous_ai
         else:
             # Pick random direction
-            direction_x, direction_y = random.choice(
-                [
-                    (-1, -1),
-                    (0, -1),
-                    (1, -1),
-                    (-1, 0),
-                    (1, 0),
-                    (-1, 1),
-                    (0, 1),
-                    (1, 1),
-                ]
-            )
+            direction_x, direction_y = random.choice(DIRECTIONS)
 
             self.turns_remaining -= 1
+            self.changed()
 
             # The actor will either try to move or attack in the choosen random direction.
             # Its possible the actor will just bump into the wall wasting a turn
@@ -2,16 +2,20 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from slotted import Slotted
+
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
     from game_map import GameMap
 
 
-class BaseComponent:
+class BaseComponent(Slotted):
     # Own entity instance
     parent: Entity
 
+    __slots__ = ('parent',)
+
     @property
     def gamemap(self) -> GameMap:
         return self.parent.gamemap
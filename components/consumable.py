@@ -6,6 +6,7 @@ import actions
 import colour
 import components.ai
 import components.inventory
+import queries
 from components.base_component import BaseComponent
 from exceptions import Impossible
 from input_handlers import ActionOrHandler, AreaRangedAttackHandler, SingleRangedAttackHandler
@@ -17,6 +18,8 @@ if TYPE_CHECKING:
 class Consumable(BaseComponent):
     parent: Item
 
+    __slots__ = ()
+
     def get_action(self, consumer: Actor) -> ActionOrHandler | None:
         """Try and return the action for item"""
         return actions.ItemAction(consumer, self.parent)
@@ -37,6 +40,8 @@ class Consumable(BaseComponent):
 
 
 class ConfusionConsumable(Consumable):
+    __slots__ = ('number_of_turns',)
+
     def __init__(self, number_of_turns: int):
         self.number_of_turns = number_of_turns
 
@@ -68,6 +73,8 @@ class ConfusionConsumable(Consumable):
 
 
 class HealingConsumable(Consumable):
+    __slots__ = ('amount',)
+
     def __init__(self, amount: int):
         self.amount = amount
 
@@ -86,6 +93,8 @@ class HealingConsumable(Consumable):
 
 
 class FireballDamageConsumable(Consumable):
+    __slots__ = ('damage', 'radius')
+
     def __init__(self, damage: int, radius: int):
         self.damage = damage
         self.radius = radius
@@ -102,37 +111,30 @@ class FireballDamageConsumable(Consumable):
         if not self.engine.game_map.visible[target_xy]:
             raise Impossible('You cannot target an area you cannot see.')
 
-        targets_hit = False
-        for actor in self.engine.game_map.actors:
-            if actor.distance(*target_xy) <= self.radius:
-                self.engine.message_log.add_message(
-                    f'The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!'
-                )
-                actor.fighter.take_damage(self.damage)
-                targets_hit = True
-
-        if not targets_hit:
+        game_map = self.engine.game_map
+        targets = queries.actors_within(game_map, *target_xy, self.radius)
+        if not targets:
             raise Impossible('There are no targets in the radius.')
+
+        for actor in targets:
+            self.engine.message_log.add_message(
+                f'The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!'
+            )
+        game_map.actor_store.damage(targets, self.damage)
         self.consume()
 
 
 class LightningDamageConsumable(Consumable):
+    __slots__ = ('damage', 'max_range')
+
     def __init__(self, damage: int, max_range: int):
         self.damage = damage
         self.max_range = max_range
 
     def activate(self, action: actions.ItemAction) -> None:
         consumer = action.entity
-        target = None
-        closest_distance = self.max_range + 1.0
-
-        for actor in self.engine.game_map.actors:
-            if actor is not consumer and self.parent.gamemap.visible[actor.x, actor.y]:
-                distance = consumer.distance(actor.x, actor.y)
-
-                if distance < closest_distance:
-                    target = actor
-                    closest_distance = distance
+        game_map = self.engine.game_map
+        target = queries.nearest_visible_actor(game_map, consumer.x, consumer.y, self.max_range, exclude=consumer)
 
         if target:
             self.engine.message_log.add_message(
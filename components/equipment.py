@@ -12,6 +12,8 @@ if TYPE_CHECKING:
 class Equipment(BaseComponent):
     parent: Actor
 
+    __slots__ = ('weapon', 'armour')
+
     def __init__(self, weapon: Item | None = None, armour: Item | None = None):
         self.weapon = weapon
         self.armour = armour
@@ -12,6 +12,8 @@ if TYPE_CHECKING:
 class Equippable(BaseComponent):
     parent: Item
 
+    __slots__ = ('equipment_type', 'power_bonus', 'defense_bonus')
+
     def __init__(
         self,
         equipment_type: EquipmentType,
@@ -25,20 +27,28 @@ class Equippable(BaseComponent):
 
 
 class Dagger(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, power_bonus=2)
 
 
 class Sword(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.WEAPON, power_bonus=4)
 
 
 class LeatherArmour(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.ARMOUR, defense_bonus=1)
 
 
 class ChainMail(Equippable):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(equipment_type=EquipmentType.ARMOUR, defense_bonus=3)
@@ -10,27 +10,55 @@ if TYPE_CHECKING:
     from entity import Actor
 
 
+def stored(name: str) -> property:
+    """
+    A stat kept in the actors row of the maps ActorStore while it's on one
+
+    Otherwise it's kept in the fighters own slot of the same name with a
+    leading underscore, see actor_store.py.
+    """
+    slot = f'_{name}'
+
+    def getter(self: Fighter) -> int:
+        actor = self.parent
+        if actor.store is not None:
+            return getattr(actor.store, name).item(actor.row)
+        return getattr(self, slot)
+
+    def setter(self: Fighter, value: int) -> None:
+        if not self.parent.write_column(name, value):
+            setattr(self, slot, value)
+
+    return property(getter, setter)
+
+
 # Inherit base component to allow access to entity and engine
 class Fighter(BaseComponent):
     parent: Actor
 
+    __slots__ = ('_max_hp', '_hp', '_base_defense', '_base_power')
+
+    max_hp = stored('max_hp')
+    base_defense = stored('base_defense')
+    base_power = stored('base_power')
+
     def __init__(self, hp: int, base_defense: int, base_power: int):
-        # Getter and setter of hp, allows access of hp as normal var
-        self.max_hp = hp
+        # Not given to an actor yet, so straight to the slots
+        self._max_hp = hp
         self._hp = hp
-        self.base_defense = base_defense
-        self.base_power = base_power
+        self._base_defense = base_defense
+        self._base_power = base_power
 
     # Getter: returns the hp
-    @property
-    def hp(self) -> int:
-        return self._hp
+    hp = stored('hp')
 
     # Setter: always between 0 and max
     @hp.setter
     def hp(self, value: int) -> None:
-        self._hp = max(0, min(value, self.max_hp))
-        if self._hp == 0 and self.parent.ai:
+        value = max(0, min(value, self.max_hp))
+        if not self.parent.write_column('hp', value):
+            self._hp = value
+        if value == 0 and self.parent.ai:
             self.die()
 
     @property
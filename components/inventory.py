@@ -11,6 +11,8 @@ if TYPE_CHECKING:
 class Inventory(BaseComponent):
     parent: Actor
 
+    __slots__ = ('capacity', 'items')
+
     def __init__(self, capacity: int):
         self.capacity = capacity
         self.items: List[Item] = []
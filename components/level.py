@@ -11,6 +11,8 @@ if TYPE_CHECKING:
 class Level(BaseComponent):
     parent: Actor
 
+    __slots__ = ('current_level', 'current_xp', 'level_up_base', 'level_up_factor', 'xp_given')
+
     def __init__(
         self,
         current_level: int = 1,
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Generate floors in bulk and report statistics on them
+
+Runs procgen for every combination of world seed and floor number across
+a pool of worker processes, then aggregates the room count, floor
+coverage, monster and item counts and the walking distance from the
+start of the floor to the down stairs into histograms per floor. Floors
+whose down stairs can't be reached are left out of the distance and
+counted as missing:
+
+    python dungeon_stats.py --seeds 2000 --floors 1-10 --output stats.json
+    python dungeon_stats.py --seeds 500 --max-rooms 40 --format csv
+
+Use it to see the effect of tuning the room settings or the spawn tables
+in procgen.py across thousands of floors rather than a single game.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, TextIO
+
+import numpy as np
+import tcod
+
+from entity import Actor, Item
+from pregen import generate_standalone_floor
+
+# Histogram bin width of each statistic, the rest are counted exactly
+BIN_WIDTHS = {'coverage': 0.02, 'stair_distance': 5}
+
+
+def parse_floors(floors: str) -> List[int]:
+    """Parse floors given as e.g. '1-10' or '1,3,6'"""
+    result: List[int] = []
+    for part in floors.split(','):
+        first, _, last = part.partition('-')
+        result.extend(range(int(first), int(last or first) + 1))
+    return result
+
+
+def sample_floor(settings: Dict[str, int], seed: int, floor: int) -> Dict[str, Any]:
+    """Generate one floor and measure it, run in the workers"""
+    game_map = generate_standalone_floor(settings, seed, floor)
+
+    # Steps from where the player arrives to the down stairs, moving
+    # diagonally costs the same as moving straight like in the game
+    start = game_map.upstairs_location or game_map.rooms[0].center
+    graph = tcod.path.SimpleGraph(cost=game_map.walkable.astype(np.int8), cardinal=1, diagonal=1)
+    pathfinder = tcod.path.Pathfinder(graph)
+    pathfinder.add_root(start)
+    pathfinder.resolve()
+    distance = int(pathfinder.distance[game_map.downstairs_location])
+
+    return {
+        'seed': seed,
+        'floor': floor,
+        'rooms': len(game_map.rooms),
+        'coverage': float(np.count_nonzero(game_map.walkable)) / game_map.walkable.size,
+        'monsters': sum(isinstance(entity, Actor) for entity in game_map.entities),
+        'items': sum(isinstance(entity, Item) for entity in game_map.entities),
+        # None when the stairs can't be reached
+        'stair_distance': distance if distance < np.iinfo(pathfinder.distance.dtype).max else None,
+    }
+
+
+def generate_samples(
+    settings: Dict[str, int],
+    seeds: Iterable[int],
+    floors: Iterable[int],
+    workers: int,
+) -> List[Dict[str, Any]]:
+    """Sample every floor of every seed, spread over this many processes"""
+    jobs = [(seed, floor) for seed in seeds for floor in floors]
+    sample = functools.partial(sample_floor, settings)
+
+    if workers <= 1:
+        return [sample(seed, floor) for seed, floor in jobs]
+
+    # Big chunks keep the workers busy generating rather than messaging
+    chunksize = max(1, math.ceil(len(jobs) / (workers * 8)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(sample, *zip(*jobs), chunksize=chunksize))
+
+
+def histogram(values: List[float], bin_width: float) -> Dict[str, int]:
+    """Count values into bins keyed by each bins lower bound"""
+    counts: Dict[str, int] = {}
+    for value in sorted(values):
+        key = f'{math.floor(value / bin_width) * bin_width:g}'
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def aggregate(samples: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarise the samples per floor and over all floors
+
+    Samples without a value, like the distance to stairs that can't be
+    reached, are left out of a statistic and counted as its missing.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {'all': samples}
+    for sample in samples:
+        groups.setdefault(str(sample['floor']), []).append(sample)
+
+    summary = {}
+    for group, group_samples in groups.items():
+        summary[group] = {}
+        for name in ('rooms', 'coverage', 'monsters', 'items', 'stair_distance'):
+            values = [sample[name] for sample in group_samples if sample[name] is not None]
+            summary[group][name] = {
+                'mean': sum(values) / len(values) if values else None,
+                'min': min(values, default=None),
+                'max': max(values, default=None),
+                'missing': len(group_samples) - len(values),
+                'histogram': histogram(values, BIN_WIDTHS.get(name, 1)),
+            }
+    return summary
+
+
+def write_csv(summary: Dict[str, Dict[str, Any]], output: TextIO) -> None:
+    """Write the histograms as floor, statistic, bin, count rows"""
+    writer = csv.writer(output)
+    writer.writerow(['floor', 'statistic', 'bin', 'count'])
+    for group, statistics in summary.items():
+        for name, statistic in statistics.items():
+            for key, count in statistic['histogram'].items():
+                writer.writerow([group, name, key, count])
+            if statistic['missing']:
+                writer.writerow([group, name, 'missing', statistic['missing']])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seeds', type=int, default=1000, help='number of world seeds to generate')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--floors', default='1-10', help="floors to generate for every seed, e.g. '1-10' or '1,3,6'")
+    parser.add_argument('--map-width', type=int, default=80)
+    parser.add_argument('--map-height', type=int, default=43)
+    parser.add_argument('--max-rooms', type=int, default=30)
+    parser.add_argument('--room-min-size', type=int, default=6)
+    parser.add_argument('--room-max-size', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes, 1 runs inline')
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--output', default=None, help='file to write to, default is stdout')
+    args = parser.parse_args()
+
+    settings = {
+        'map_width': args.map_width,
+        'map_height': args.map_height,
+        'max_rooms': args.max_rooms,
+        'room_min_size': args.room_min_size,
+        'room_max_size': args.room_max_size,
+    }
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    floors = parse_floors(args.floors)
+
+    start = time.perf_counter()
+    samples = generate_samples(settings, seeds, floors, args.workers)
+    elapsed = time.perf_counter() - start
+
+    summary = aggregate(samples)
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout  # noqa: SIM115
+    try:
+        if args.format == 'csv':
+            write_csv(summary, output)
+        else:
+            report = {
+                'settings': settings,
+                'seeds': [seeds.start, seeds.stop],
+                'floors': floors,
+                'samples': len(samples),
+                'workers': args.workers,
+                'elapsed': elapsed,
+                'summary': summary,
+            }
+            json.dump(report, output, indent=2)
+            output.write('\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(  # noqa: T201
+        f'{len(samples)} floors in {elapsed:.2f}s ({len(samples) / elapsed:.1f} floors/s) on {args.workers} workers',
+        file=sys.stderr,
+    )
+
+
+if __name__ == '__main__':
+    main()
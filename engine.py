@@ -1,15 +1,17 @@
 from __future__ import annotations
 
-import lzma
 import pickle
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Tuple
 
+import numpy as np
 from tcod.console import Console
-from tcod.map import compute_fov
 
 import exceptions
+import fov
 import render_functions
-from message_log import MessageLog
+import save_codecs
+from camera import Camera
+from message_log import MessageLog, remove_stale_archives
 
 if TYPE_CHECKING:
     from entity import Actor
@@ -24,12 +26,32 @@ class Engine:
     def __init__(
         self,
         player: Actor,
+        message_archive_path: str | None = None,
+        viewport_size: Tuple[int, int] = (80, 43),
     ):
-        self.message_log = MessageLog()
+        self.message_log = MessageLog(archive_path=message_archive_path)
+        # Part of the console the map is drawn in, following the player
+        self.camera = Camera(*viewport_size)
+        # Algorithm from fov.ALGORITHMS the players view is computed with
+        self.fov_algorithm = fov.DEFAULT_ALGORITHM
+        # Console tile under the mouse, see mouse_map_location for the map position
         self.mouse_location = (0, 0)
         self.player = player
+        # Distance of every tile to the player, shared by all hostiles this turn
+        self.player_distance: np.ndarray | None = None
+        # Distance fields and paths searched for during the last enemy turn
+        self.pathfinder_calls = 0
+        # Number of turns played so far
+        self.turn = 0
 
     def handle_enemy_turns(self) -> None:
+        self.turn += 1
+        self.pathfinder_calls = 0
+
+        # One search for the whole turn, every hostile then steps down it.
+        # Reused from last turn if neither the player nor anything else moved
+        self.player_distance = self.game_map.compute_distance_field(self.player.x, self.player.y)
+
         for entity in set(self.game_map.actors) - {self.player}:
             if entity.ai:
                 try:
@@ -41,23 +63,38 @@ class Engine:
         """
         Recompute the visible area based on the players POV
 
-        compute_fov takes arguments (transparency, pov, radius)
-
-        //TODO: investigate the function more to consider more complex
-        FOV algorithms
+        The FOV is computed on a window of the map around the player by
+        GameMap.compute_fov, with the algorithm in self.fov_algorithm, see
+        fov.py for the choices
         """
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles['transparent'],
-            (self.player.x, self.player.y),
-            radius=8,
+        game_map = self.game_map
+
+        # Results are cached per position, so waiting costs next to nothing
+        region, visible = game_map.compute_fov(
+            self.player.x, self.player.y, self.player.vision_radius, self.fov_algorithm
         )
 
+        # What was visible needs redrawing in the dark as well as what will
+        # be. Nothing outside the FOV region is visible, so only it and the
+        # new region need touching rather than the whole map
+        game_map.mark_dirty(game_map.fov_region)
+        game_map.visible[game_map.fov_region] = False
+
+        game_map.visible[region] = visible
+        game_map.fov_region = region
+        game_map.mark_dirty(region)
+
         # If it is now visible then we add it to explored
-        self.game_map.explored |= self.game_map.visible
+        if game_map.changes is not None:
+            new_x, new_y = np.nonzero(visible & ~game_map.explored[region])
+            cells = (new_x + region[0].start, new_y + region[1].start)
+            game_map.changes.explored.append(np.ravel_multi_index(cells, game_map.explored.shape))
+        game_map.explored[region] |= visible
 
     # Draw screen and iterate through entities to print to screen
     def render(self, console: Console) -> None:
-        self.game_map.render(console)
+        self.camera.centre_on(self.player.x, self.player.y, self.game_map)
+        self.game_map.render(console, self.camera)
 
         self.message_log.render(console=console, x=21, y=45, width=40, height=5)
 
@@ -76,8 +113,7 @@ class Engine:
 
         render_functions.render_names_at_mouse_location(console=console, x=21, y=44, engine=self)
 
-    def save_as(self, filename: str) -> None:
-        """Save this Engine instance as a compressed file."""
-        save_data = lzma.compress(pickle.dumps(self))
-        with open(filename, 'wb') as f:
-            f.write(save_data)
+    def save_as(self, filename: str, codec: str = save_codecs.DEFAULT_CODEC) -> None:
+        """Save this Engine instance as a compressed file, see save_codecs for the codecs."""
+        save_codecs.write_atomic(filename, save_codecs.encode(pickle.dumps(self), codec))
+        remove_stale_archives(filename, self.message_log.archive_path)
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-import copy
 import math
-from typing import TYPE_CHECKING, Tuple, Type, TypeVar
+from typing import TYPE_CHECKING, Tuple, Type
 
 from render_order import RenderOrder
+from slotted import Slotted
 
 if TYPE_CHECKING:
     from componets.equipment import Equipment
 
+    from actor_store import ActorStore
     from components.ai import BaseAI
     from components.consumable import Consumable
     from components.equippable import Equippable
@@ -21,10 +22,8 @@ if TYPE_CHECKING:
 # // TODO: block_movement always True for actor. Ghost enemies???
 # // TODO: maybe when certain ghosts die they turn into ghosts
 
-T = TypeVar('T', bound='Entity')
 
-
-class Entity:
+class Entity(Slotted):
     """
     A generic object that will store representations of players,
     enemies, items and anyting else
@@ -32,6 +31,8 @@ class Entity:
 
     parent: GameMap | Inventory
 
+    __slots__ = ('parent', 'x', 'y', 'char', 'colour', 'name', '_blocks_movement', 'render_order')
+
     # char is display character, colour is rgb
     def __init__(
         self,
@@ -49,42 +50,52 @@ class Entity:
         self.char = char
         self.colour = colour
         self.name = name
-        self.blocks_movement = blocks_movement
+        self._blocks_movement = blocks_movement
         self.render_order = render_order
         if parent:
             # If parent isnt here now it will be later set
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
 
     @property
     def gamemap(self) -> GameMap:
         return self.parent.gamemap
 
-    def spawn(self: T, gamemap: GameMap, x: int, y: int) -> T:
-        """Spawn a copy of this instance at the location"""
-        clone = copy.deepcopy(self)
-        clone.x = x
-        clone.y = y
-        clone.parent = gamemap
-        gamemap.entities.add(clone)
-        return clone
+    @property
+    def blocks_movement(self) -> bool:
+        return self._blocks_movement
+
+    @blocks_movement.setter
+    def blocks_movement(self, value: bool) -> None:
+        # Keep the maps occupancy layer up to date, e.g. when an actor dies
+        if value != self._blocks_movement and hasattr(self, 'parent') and self.parent is self.gamemap:
+            self.parent.update_occupancy(self.x, self.y, 1 if value else -1)
+        self._blocks_movement = value
 
     # //TODO: This needed??
     def move(self, dx: int, dy: int) -> None:
         # Move by amount
-        self.x += dx
-        self.y += dy
+        self.place(self.x + dx, self.y + dy)
 
     def place(self, x: int, y: int, gamemap: GameMap | None = None) -> None:
         """Place at new location. Handles moving across the map"""
-        self.x = x
-        self.y = y
         if gamemap:
             # We could be uninitialised
             if hasattr(self, 'parent') and self.parent is self.gamemap:
-                self.gamemap.entities.remove(self)
+                self.gamemap.remove_entity(self)
+            # A new map may have been built with us already in it
+            if self in gamemap.entities:
+                gamemap.remove_entity(self)
+            self.x = x
+            self.y = y
             self.parent = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
+        elif hasattr(self, 'parent') and self.parent is self.gamemap:
+            # Keep the maps spatial index up to date
+            self.gamemap.relocate_entity(self, x, y)
+        else:
+            self.x = x
+            self.y = y
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -93,8 +104,22 @@ class Entity:
         return math.sqrt((x - self.x) ** 2 + (y - self.y) ** 2)
 
 
+# The x and y slots of Entity. Actor shadows them with properties and only
+# keeps its position in them while it has no row in an ActorStore
+ENTITY_X = Entity.__dict__['x']
+ENTITY_Y = Entity.__dict__['y']
+
+
 class Actor(Entity):
-    # Actor class init
+    """
+    An entity that fights, levels up and carries things
+
+    While on a map its position, hp and stats are kept in its row of the
+    maps ActorStore, which x, y and the Fighter stats read and write.
+    """
+
+    __slots__ = ('_ai', 'vision_radius', 'equipment', 'fighter', 'inventory', 'level', 'store', 'row')
+
     def __init__(
         self,
         *,
@@ -108,7 +133,12 @@ class Actor(Entity):
         fighter: Fighter,
         inventory: Inventory,
         level: Level,
+        vision_radius: int = 8,
     ):
+        # Not on a map yet, see ActorStore.add
+        self.store: ActorStore | None = None
+        self.row = -1
+
         super().__init__(
             x=x,
             y=y,
@@ -118,7 +148,10 @@ class Actor(Entity):
             blocks_movement=True,
             render_order=RenderOrder.ACTOR,
         )
-        self.ai: BaseAI | None = ai_cls(self)
+        self.ai = ai_cls(self)
+
+        # How far this actor can see
+        self.vision_radius = vision_radius
 
         self.equipment: Equipment = equipment
         self.equipment.parent = self
@@ -132,6 +165,49 @@ class Actor(Entity):
         self.level = level
         self.level.parent = self
 
+    @property  # type: ignore[override]
+    def x(self) -> int:
+        if self.store is not None:
+            return self.store.x.item(self.row)
+        return ENTITY_X.__get__(self)
+
+    @x.setter
+    def x(self, value: int) -> None:
+        if not self.write_column('x', value):
+            ENTITY_X.__set__(self, value)
+
+    @property  # type: ignore[override]
+    def y(self) -> int:
+        if self.store is not None:
+            return self.store.y.item(self.row)
+        return ENTITY_Y.__get__(self)
+
+    @y.setter
+    def y(self, value: int) -> None:
+        if not self.write_column('y', value):
+            ENTITY_Y.__set__(self, value)
+
+    @property
+    def ai(self) -> BaseAI | None:
+        return self._ai
+
+    @ai.setter
+    def ai(self, value: BaseAI | None) -> None:
+        self._ai = value
+        # Dying, or being brought back by the journal, changes the alive column
+        self.write_column('alive', bool(value))
+
+    def write_column(self, name: str, value: int) -> bool:
+        """Write to a column of this actors row, returning False if it has no row to write to"""
+        # Unpickling sets x and y before store, so it may not be there yet
+        store = getattr(self, 'store', None)
+        if store is None:
+            return False
+        getattr(store, name)[self.row] = value
+        # Also what the journal saves, so flag it for the next one
+        self.parent.mark_changed(self)  # type: ignore[union-attr]
+        return True
+
     @property
     def is_alive(self) -> bool:
         """Returns true as long as this actor is alive and can perform"""
@@ -139,6 +215,8 @@ class Actor(Entity):
 
 
 class Item(Entity):
+    __slots__ = ('consumable', 'equippable')
+
     def __init__(
         self,
         *,
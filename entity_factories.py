@@ -5,94 +5,108 @@ from components.fighter import Fighter
 from components.inventory import Inventory
 from components.level import Level
 from entity import Actor, Item
+from template import Template
 
+# Each entry is a Template, build or spawn one to get a new entity with its
+# own components
 # //TODO: create new class for player only
 # Inventory of 26, one for each letter to call them from the inventory screen
-player = Actor(
+player = Template(
+    Actor,
     char='@',
     colour=(255, 255, 255),
     name='Player',
     ai_cls=HostileEnemy,
-    equipment=Equipment(),
-    fighter=Fighter(hp=30, base_defense=1, base_power=2),
-    inventory=Inventory(capacity=26),
-    level=Level(level_up_base=200),
+    equipment=Template(Equipment),
+    fighter=Template(Fighter, hp=30, base_defense=1, base_power=2),
+    inventory=Template(Inventory, capacity=26),
+    level=Template(Level, level_up_base=200),
 )
 
-orc = Actor(
+orc = Template(
+    Actor,
     char='o',
     colour=(63, 127, 63),
     name='Orc',
     ai_cls=HostileEnemy,
-    equipment=Equipment(),
-    fighter=Fighter(hp=10, base_defense=0, base_power=3),
-    inventory=Inventory(capacity=0),
-    level=Level(xp_given=35),
+    equipment=Template(Equipment),
+    fighter=Template(Fighter, hp=10, base_defense=0, base_power=3),
+    inventory=Template(Inventory, capacity=0),
+    level=Template(Level, xp_given=35),
 )
 
-troll = Actor(
+troll = Template(
+    Actor,
     char='T',
     colour=(0, 127, 0),
     name='Troll',
     ai_cls=HostileEnemy,
-    equipment=Equipment(),
-    fighter=Fighter(hp=16, base_defense=1, base_power=4),
-    inventory=Inventory(capacity=0),
-    level=Level(xp_given=100),
+    equipment=Template(Equipment),
+    fighter=Template(Fighter, hp=16, base_defense=1, base_power=4),
+    inventory=Template(Inventory, capacity=0),
+    level=Template(Level, xp_given=100),
 )
 
-confusion_scroll = Item(
+confusion_scroll = Template(
+    Item,
     char='~',
     colour=(207, 63, 255),
     name='Confusion Scroll',
-    consumable=consumable.ConfusionConsumable(number_of_turns=10),
+    consumable=Template(consumable.ConfusionConsumable, number_of_turns=10),
 )
 
-fireball_scroll = Item(
+fireball_scroll = Template(
+    Item,
     char='~',
     colour=(255, 0, 0),
     name='Fireball Scroll',
-    consumable=consumable.FireballDamageConsumable(damage=12, radius=3),
+    consumable=Template(consumable.FireballDamageConsumable, damage=12, radius=3),
 )
 
-health_potion = Item(
+health_potion = Template(
+    Item,
     char='!',
     colour=(127, 0, 255),
     name='Health Potion',
-    consumable=consumable.HealingConsumable(amount=4),
+    consumable=Template(consumable.HealingConsumable, amount=4),
 )
 
-lightning_scroll = Item(
+lightning_scroll = Template(
+    Item,
     char='~',
     colour=(255, 255, 0),
     name='Lightning Scroll',
-    consumable=consumable.LightningDamageConsumable(damage=20, max_range=5),
+    consumable=Template(consumable.LightningDamageConsumable, damage=20, max_range=5),
 )
 
-dagger = Item(
+dagger = Template(
+    Item,
     char='/',
     colour=(0, 191, 255),
     name='Dagger',
-    equippable=equippable.Dagger(),
+    equippable=Template(equippable.Dagger),
 )
 
-sword = Item(
+sword = Template(
+    Item,
     char='/',
     colour=(0, 191, 255),
     name='Sword',
-    equippable=equippable.Sword(),
+    equippable=Template(equippable.Sword),
 )
 
-leather_armour = Item(
+leather_armour = Template(
+    Item,
     char='/',
     colour=(0, 191, 255),
     name='Leather Armour',
-    equippable=equippable.LeatherArmour(),
+    equippable=Template(equippable.LeatherArmour),
 )
 
-chain_mail = Item(
+chain_mail = Template(
+    Item,
     char='/',
     colour=(0, 191, 255),
     name='Chain Mail',
-    equippable=equippable.ChainMail(),
+    equippable=Template(equippable.ChainMail),
 )
@@ -0,0 +1,184 @@
+"""
+Cache of visited floors, so the player can go back up the stairs
+
+Only the active floor is kept as live objects. Floors the player has left
+are pickled and compressed into blobs held in memory, the most recently
+left first to be revisited. Once there are more blobs than max_in_memory,
+or they take more than memory_budget bytes, the least recently used ones
+are moved out to one file per floor on disk.
+
+A floor is only unpickled again when the player comes back to it.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict
+
+import save_codecs
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from game_map import GameMap
+
+
+class FloorPickler(pickle.Pickler):
+    """Pickles a floor without the engine and player it refers to, they stay live"""
+
+    def __init__(self, file: io.BytesIO, engine: Engine):
+        super().__init__(file)
+        self.engine = engine
+
+    def persistent_id(self, obj: Any) -> str | None:
+        if obj is self.engine:
+            return 'engine'
+        if obj is self.engine.player:
+            return 'player'
+        return None
+
+
+class FloorUnpickler(pickle.Unpickler):
+    """Unpickles a floor, reattaching it to the running engine and player"""
+
+    def __init__(self, file: io.BytesIO, engine: Engine):
+        super().__init__(file)
+        self.engine = engine
+
+    def persistent_load(self, pid: str) -> Any:
+        if pid == 'engine':
+            return self.engine
+        if pid == 'player':
+            return self.engine.player
+        raise pickle.UnpicklingError(f'Unknown persistent id {pid!r}')
+
+
+def dump_floor(game_map: GameMap, codec: str) -> bytes:
+    """Pickle and compress a floor the player isn't on"""
+    buffer = io.BytesIO()
+    FloorPickler(buffer, game_map.engine).dump(game_map)
+    return save_codecs.encode(buffer.getvalue(), codec)
+
+
+def load_floor(blob: bytes, engine: Engine) -> GameMap:
+    """Unpickle a floor from dump_floor into a running engine"""
+    game_map: GameMap = FloorUnpickler(io.BytesIO(save_codecs.decode(blob)), engine).load()
+    return game_map
+
+
+class FloorCache:
+    def __init__(
+        self,
+        max_in_memory: int = 4,
+        memory_budget: int = 4 * 1024 * 1024,
+        directory: str | None = None,
+        codec: str = 'zlib',
+    ):
+        """
+        Args:
+            max_in_memory (int): Most floors kept as blobs in memory
+            memory_budget (int): Most bytes of blobs kept in memory
+            directory (str): Where evicted floors are written, a temporary
+                directory removed with the cache if not given
+            codec (str): Codec for the blobs, see save_codecs
+        """
+        self.max_in_memory = max_in_memory
+        self.memory_budget = memory_budget
+        self.directory = directory
+        # Set when the directory is a temporary one made by this cache
+        self.temporary_directory: str | None = None
+        self.codec = codec
+
+        # Floor -> blob, least recently used first, None once moved to disk
+        self.floors: OrderedDict[int, bytes | None] = OrderedDict()
+        # Bytes of blobs held in memory
+        self.memory = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Floors on disk are pulled back into the save so it stands on its
+        # own, they go back out to disk when the save is loaded
+        state = self.__dict__.copy()
+        state['floors'] = OrderedDict((floor, self.read(floor)) for floor in self.floors)
+        state['memory'] = sum(len(blob) for blob in state['floors'].values())
+        if self.temporary_directory is not None:
+            state['directory'] = state['temporary_directory'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.evict()
+
+    def __contains__(self, floor: int) -> bool:
+        return floor in self.floors
+
+    def __len__(self) -> int:
+        return len(self.floors)
+
+    def path(self, floor: int) -> str:
+        """File a floor is written to when it is moved out of memory"""
+        if self.directory is None:
+            self.directory = self.temporary_directory = tempfile.mkdtemp(prefix='rogue-floors-')
+            weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+        return os.path.join(self.directory, f'floor-{floor}.sav')
+
+    def store(self, floor: int, game_map: GameMap) -> None:
+        """Compress a floor the player has left into the cache"""
+        blob = dump_floor(game_map, self.codec)
+
+        self.discard(floor)
+        self.floors[floor] = blob
+        self.memory += len(blob)
+        self.evict()
+
+    def load(self, floor: int, engine: Engine) -> GameMap | None:
+        """
+        Take a floor out of the cache and unpickle it
+
+        Returns None if the floor has never been visited.
+        """
+        if floor not in self.floors:
+            return None
+
+        blob = self.read(floor)
+        self.discard(floor)
+        return load_floor(blob, engine)
+
+    def read(self, floor: int) -> bytes:
+        """Return a floors blob, from memory or disk"""
+        blob = self.floors[floor]
+        if blob is not None:
+            return blob
+        with open(self.path(floor), 'rb') as f:
+            return f.read()
+
+    def discard(self, floor: int) -> None:
+        """Drop a floor from the cache, wherever it is"""
+        if floor not in self.floors:
+            return
+        blob = self.floors.pop(floor)
+        if blob is None:
+            os.remove(self.path(floor))
+        else:
+            self.memory -= len(blob)
+
+    def evict(self) -> None:
+        """Move the least recently used blobs to disk until within the limits"""
+        in_memory = [floor for floor, blob in self.floors.items() if blob is not None]
+        count = len(in_memory)
+
+        for floor in in_memory:
+            if count <= self.max_in_memory and self.memory <= self.memory_budget:
+                break
+
+            blob = self.floors[floor]
+            assert blob is not None
+            save_codecs.write_atomic(self.path(floor), blob)
+
+            self.floors[floor] = None
+            self.memory -= len(blob)
+            count -= 1
@@ -0,0 +1,218 @@
+"""
+Field of view algorithms
+
+Every algorithm takes a transparency array, a point of view and a radius
+and returns an array the same shape as the transparency, True where the
+point of view can see. They are registered in ALGORITHMS by name and the
+one the game uses defaults to DEFAULT_ALGORITHM, which can be set with
+the ROGUE_FOV environment variable:
+
+    tcod  libtcod's compute_fov
+    rays  precomputed rays checked with NumPy, see below
+
+The rays algorithm precomputes, once per radius, the Bresenham lines
+both ways between the viewer and every tile within the radius, worked
+out for one octant and mirrored into the other seven. A tile is visible
+when every tile along either line is transparent, which makes the result
+symmetric. Checking the lines is one gather over the tables, so many
+viewers can be checked at once with batch.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import tcod
+
+# transparency, (x, y), radius -> visible
+Algorithm = Callable[[np.ndarray, Tuple[int, int], int], np.ndarray]
+
+# Most viewers checked at once by batch
+BATCH_SIZE = 256
+
+# Eight True bools read as one uint64
+ALL_TRUE = np.frombuffer(bytes([1] * 8), dtype=np.uint64)[0]
+
+# The eight ways of mirroring octant 0 (0 <= dy <= dx) onto the others,
+# as (swap x and y, x sign, y sign)
+OCTANTS = [(swap, sx, sy) for swap in (False, True) for sx in (1, -1) for sy in (1, -1)]
+
+
+def mirror(point: Tuple[int, int], swap: bool, sx: int, sy: int) -> Tuple[int, int]:
+    """Mirror a point in octant 0 onto another octant"""
+    x, y = (point[1], point[0]) if swap else (point[0], point[1])
+    return x * sx, y * sy
+
+
+def tcod_fov(transparency: np.ndarray, pov: Tuple[int, int], radius: int) -> np.ndarray:
+    """libtcod's default FOV"""
+    return tcod.map.compute_fov(transparency, pov, radius=radius)
+
+
+class RayTable:
+    """
+    Lines of sight from a viewer at (0, 0) to every tile within a radius
+
+    Attributes:
+        offsets: (n, 2) offset of each tile from the viewer
+        rays: (n, 2, length, 2) offsets of the tiles between the viewer and
+            each tile, along the line there and the line back
+        padding: (n, 2, length // 8) words with a byte of 1 where a ray is
+            shorter than length and the offset is only filler. length is
+            a multiple of 8 so the bools along a ray can be checked 8 at
+            a time as uint64 words
+        reach: (n,) radius needed to reach each tile, the larger of its x
+            and y distance from the viewer
+    """
+
+    def __init__(self, radius: int):
+        self.radius = radius
+
+        # Like tcod, the radius reaches out as a square rather than a circle
+        octant_offsets = [(dx, dy) for dx in range(radius + 1) for dy in range(dx + 1)]
+        octant_rays = [
+            (
+                tcod.los.bresenham((0, 0), (dx, dy))[1:-1].tolist(),
+                tcod.los.bresenham((dx, dy), (0, 0))[1:-1].tolist(),
+            )
+            for dx, dy in octant_offsets
+        ]
+        length = max([len(ray) for pair in octant_rays for ray in pair] + [1])
+        length = -(-length // 8) * 8
+
+        # Build every octant by mirroring octant 0, tiles on the edges of
+        # an octant are shared with the next so keep the first of each
+        offsets: Dict[Tuple[int, int], Tuple[List[Tuple[int, int]], ...]] = {}
+        for octant in OCTANTS:
+            for offset, pair in zip(octant_offsets, octant_rays):
+                mirrored = tuple([mirror(point, *octant) for point in ray] for ray in pair)
+                offsets.setdefault(mirror(offset, *octant), mirrored)
+
+        count = len(offsets)
+        self.offsets = np.array(list(offsets), dtype=np.int32).reshape(count, 2)
+        self.rays = np.zeros((count, 2, length, 2), dtype=np.int32)
+        padding = np.ones((count, 2, length), dtype=np.uint8)
+        for i, pair in enumerate(offsets.values()):
+            for j, ray in enumerate(pair):
+                if ray:
+                    self.rays[i, j, : len(ray)] = ray
+                    padding[i, j, : len(ray)] = 0
+        self.padding = padding.view(np.uint64)
+
+        self.reach = np.abs(self.offsets).max(axis=1)
+
+
+@functools.cache
+def ray_table(radius: int) -> RayTable:
+    """The ray table for a radius, built on first use and kept"""
+    return RayTable(radius)
+
+
+def visible_targets(
+    table: RayTable,
+    flat: np.ndarray,
+    width: int,
+    height: int,
+    povs: np.ndarray,
+    radii: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the viewer and table index of every tile the viewers can see"""
+    # Tiles within each viewers own radius and on the map
+    targets = povs[:, None, :] + table.offsets[None, :, :]
+    in_range = (
+        (table.reach[None, :] <= radii[:, None])
+        & (targets[..., 0] >= 0)
+        & (targets[..., 0] < width)
+        & (targets[..., 1] >= 0)
+        & (targets[..., 1] < height)
+    )
+
+    # The tiles along a ray lie between the viewer and its target, so they
+    # are on the map whenever the target is. Gather them through flat
+    # indexes into the column major map, clipping only keeps the gather in
+    # bounds for targets that are thrown away anyway
+    pov_index = povs[:, 0] + povs[:, 1] * width
+    ray_index = table.rays[..., 0] + table.rays[..., 1] * width
+    along = np.take(flat, pov_index[:, None, None, None] + ray_index[None], mode='clip')
+
+    # A ray is clear when every word of it, padding included, is all True
+    along_words = (along.view(np.uint64) | table.padding[None]) == ALL_TRUE
+    clear = along_words.all(axis=3) if along_words.shape[3] > 1 else along_words[..., 0]
+
+    # Visible along the ray there or the ray back
+    return np.nonzero((clear[..., 0] | clear[..., 1]) & in_range)
+
+
+def batch(
+    transparency: np.ndarray,
+    povs: np.ndarray,
+    radii: int | np.ndarray,
+) -> np.ndarray:
+    """
+    Rays FOV for many viewers at once
+
+    Args:
+        transparency (np.ndarray): Transparency of the whole map
+        povs (np.ndarray): (n, 2) position of each viewer
+        radii (int | np.ndarray): Vision radius shared by all viewers, or
+            one per viewer, at least 1
+
+    Returns:
+        np.ndarray: (n, 2 * r + 1, 2 * r + 1) window of what each viewer
+            can see, centred on the viewer, where r is the largest radius.
+            Window cell [i, dx + r, dy + r] is the tile at povs[i] + (dx, dy)
+    """
+    povs = np.asarray(povs, dtype=np.int32).reshape(-1, 2)
+    radii = np.broadcast_to(np.asarray(radii), (len(povs),))
+    if (radii < 1).any():
+        # tcod reads 0 as no limit, which there is no table of rays for
+        raise ValueError('The rays FOV needs a radius of at least 1')
+    radius = int(radii.max(initial=0))
+
+    table = ray_table(radius)
+    width, height = transparency.shape
+    flat = np.ravel(transparency, order='F')
+
+    windows = np.zeros((len(povs), 2 * radius + 1, 2 * radius + 1), dtype=bool)
+
+    # A few hundred viewers at a time keeps the gathered rays small
+    for start in range(0, len(povs), BATCH_SIZE):
+        chunk = slice(start, start + BATCH_SIZE)
+        viewer, target = visible_targets(table, flat, width, height, povs[chunk], radii[chunk])
+        windows[viewer + start, table.offsets[target, 0] + radius, table.offsets[target, 1] + radius] = True
+
+    return windows
+
+
+def ray_fov(transparency: np.ndarray, pov: Tuple[int, int], radius: int) -> np.ndarray:
+    """Rays FOV for a single viewer"""
+    window = batch(transparency, np.array([pov]), radius)[0]
+    x, y = pov
+    width, height = transparency.shape
+
+    visible = np.zeros(transparency.shape, dtype=bool)
+    x0, y0 = max(0, x - radius), max(0, y - radius)
+    x1, y1 = min(width, x + radius + 1), min(height, y + radius + 1)
+    visible[x0:x1, y0:y1] = window[x0 - x + radius : x1 - x + radius, y0 - y + radius : y1 - y + radius]
+    return visible
+
+
+# Name -> algorithm of every FOV algorithm
+ALGORITHMS: Dict[str, Algorithm] = {
+    'tcod': tcod_fov,
+    'rays': ray_fov,
+}
+
+DEFAULT_ALGORITHM = os.environ.get('ROGUE_FOV', 'tcod')
+
+
+def compute(
+    transparency: np.ndarray, pov: Tuple[int, int], radius: int, algorithm: str = DEFAULT_ALGORITHM
+) -> np.ndarray:
+    """Compute the FOV with a named algorithm"""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f'Unknown FOV algorithm {algorithm!r}, expected one of {", ".join(ALGORITHMS)}')
+    return ALGORITHMS[algorithm](transparency, pov, radius)
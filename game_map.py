@@ -13,17 +13,60 @@ generators for different room types
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+import random
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import numpy as np
+import tcod
 from tcod.console import Console
 
+import fov
 import tile_types
+from actor_store import ActorStore
 from entity import Actor, Item
+from floor_cache import FloorCache
 
 if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from camera import Camera
     from engine import Engine
     from entity import Entity
+    from procgen import RectangularRoom
+
+# A rectangle of the map as x and y slices
+Region = Tuple[slice, slice]
+
+# FOV results kept per map by GameMap.compute_fov
+FOV_CACHE_SIZE = 32
+
+
+def axis_bounds(axis_index: Any, size: int) -> slice:
+    """Return the range covered by an int, slice or array index along one axis"""
+    if isinstance(axis_index, slice):
+        start, stop, _ = axis_index.indices(size)
+        return slice(start, stop)
+    return slice(int(np.min(axis_index)), int(np.max(axis_index)) + 1)
+
+
+def intersect_regions(a: Region, b: Region) -> Region | None:
+    """Return the overlap of two regions, None if they don't overlap"""
+    x = slice(max(a[0].start, b[0].start), min(a[0].stop, b[0].stop))
+    y = slice(max(a[1].start, b[1].start), min(a[1].stop, b[1].stop))
+    if x.start >= x.stop or y.start >= y.stop:
+        return None
+    return x, y
+
+
+class MapChanges:
+    """What has changed on a map since it was last journaled, see journal.py"""
+
+    def __init__(self) -> None:
+        self.entities: Set[Entity] = set()
+        # Flat indexes of the cells carved and the cells newly explored
+        self.tiles: List[np.ndarray] = []
+        self.explored: List[np.ndarray] = []
 
 
 class GameMap:
@@ -36,18 +79,110 @@ class GameMap:
     ):
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
-
-        # Create a 2D array filled with same values from tile_types.floor
-        # fills self.tiles with floor tiles
-        self.tiles = np.full((width, height), fill_value=tile_types.wall, order='F')
+        self.entities: Set[Entity] = set()
+
+        # Create a 2D array of tile ids filled with tile_types.wall, the
+        # tile data for each id is kept once in tile_types.palette
+        self.tiles = np.full((width, height), fill_value=tile_types.wall, dtype=np.uint8, order='F')
+
+        # Contiguous layers looked up from the palette, kept in step with
+        # self.tiles by set_tiles and handed straight to FOV and pathing
+        self.walkable = np.full((width, height), fill_value=False, order='F')
+        self.transparent = np.full((width, height), fill_value=False, order='F')
+        # Bumped whenever the layers change, so FOV results can be reused
+        # until the transparency they were computed from changes
+        self.transparency_version = 0
+        self.update_tile_layers(np.s_[:, :])
+
+        # Movement layers, updated in place as tiles are carved and blocking
+        # entities come and go so pathing and movement never rebuild them:
+        #   occupancy: number of blocking entities on each tile
+        #   blocked: True where a tile can't be walked or is occupied
+        #   cost: cost of stepping onto a tile for the pathfinder, 0 is
+        #     impassable and occupied tiles cost an extra 10. A lower number
+        #     means more enemies will crowd behind each other in hallways. A
+        #     higher number means enemies will take longer paths in order
+        #     to surround the player.
+        self.occupancy = np.zeros((width, height), dtype=np.int16, order='F')
+        self.blocked = np.full((width, height), fill_value=True, order='F')
+        self.cost = np.zeros((width, height), dtype=np.int16, order='F')
+        # Bumped whenever blocked or cost change, so paths and distance fields
+        # can be reused until something moves or a tile is carved
+        self.movement_version = 0
+        self.update_movement_layers(np.s_[:, :])
+
+        # Changes recorded for the journal, only while it's tracking this map
+        self.changes: MapChanges | None = None
+
+        # Spatial index of tile -> entities on it, kept in sync by add_entity,
+        # remove_entity and relocate_entity so per tile lookups are O(1)
+        self.entity_index: Dict[Tuple[int, int], Set[Entity]] = {}
+
+        # Position, hp and stats of the actors on this map as columns, for
+        # bulk operations, see actor_store.py
+        self.actor_store = ActorStore()
+
+        for entity in entities:
+            self.add_entity(entity)
 
         # Add new np frames for currently visible and previously seen
         self.visible = np.full((width, height), fill_value=False, order='F')
         self.explored = np.full((width, height), fill_value=False, order='F')
 
-        # Stairs location
+        # Rooms carved by procgen, the first is where the player starts
+        self.rooms: List[RectangularRoom] = []
+
+        # Stairs locations, the first floor has no way up
         self.downstairs_location = (0, 0)
+        self.upstairs_location: Tuple[int, int] | None = None
+
+        # Region last set visible by the FOV, so it can be redrawn once it
+        # isn't. Nothing outside it is visible
+        self.fov_region: Region = (slice(0, 0), slice(0, 0))
+
+        # Recent FOV results, (x, y, radius, algorithm, transparency_version) -> the
+        # region around x, y and what is visible in it, least recent first
+        self.fov_cache: OrderedDict[Tuple[int, int, int, str, int], Tuple[Region, np.ndarray]] = OrderedDict()
+
+        # The last distance field, (x, y, movement_version) -> distances, reused
+        # while the target stays put and nothing moves
+        self.distance_field: Tuple[Tuple[int, int, int], np.ndarray] | None = None
+
+        # Composited tile graphics of the cameras view from the last render,
+        # only the dirty part of it is recomposited on the next frame unless
+        # the camera has moved
+        self.graphics = np.full((0, 0), fill_value=tile_types.SHROUD, order='F')
+        self.graphics_view: Region | None = None
+        self.dirty_region: Region | None = (slice(0, width), slice(0, height))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Layers derived from the tile ids and occupancy are rebuilt when
+        # loading, the graphics are rebuilt on the first render after that
+        for name in ('walkable', 'transparent', 'blocked', 'cost', 'graphics', 'fov_cache'):
+            del state[name]
+        # Recomputed the next time it's needed
+        state['distance_field'] = None
+        # A journal starts tracking again from its next snapshot
+        state['changes'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+
+        self.walkable = np.full((self.width, self.height), fill_value=False, order='F')
+        self.transparent = np.full((self.width, self.height), fill_value=False, order='F')
+        self.update_tile_layers(np.s_[:, :])
+
+        self.blocked = np.full((self.width, self.height), fill_value=True, order='F')
+        self.cost = np.zeros((self.width, self.height), dtype=np.int16, order='F')
+        self.update_movement_layers(np.s_[:, :])
+
+        self.graphics = np.full((0, 0), fill_value=tile_types.SHROUD, order='F')
+        self.graphics_view = None
+        self.dirty_region = (slice(0, self.width), slice(0, self.height))
+
+        self.fov_cache = OrderedDict()
 
     @property
     def gamemap(self) -> GameMap:
@@ -56,34 +191,230 @@ class GameMap:
     @property
     def actors(self) -> Iterator[Actor]:
         """Iterate over this maps living actors."""
-        yield from (entity for entity in self.entities if isinstance(entity, Actor) and entity.is_alive)
+        yield from self.actor_store.living_actors()
 
     # Find itrems on same tile as player
     @property
     def items(self) -> Iterator[Item]:
         yield from (entity for entity in self.entities if isinstance(entity, Item))
 
+    def set_tiles(self, index: Any, tile: int) -> None:
+        """
+        Carve tiles into the map
+
+        index is a tuple of x and y indexes, each an int, a slice or an
+        array of coordinates, and tile is a tile id from tile_types
+        """
+        self.tiles[index] = tile
+        self.update_tile_layers(index)
+        self.update_movement_layers(index)
+        self.mark_dirty(self.index_region(index))
+
+        if self.changes is not None:
+            self.changes.tiles.append(self.flat_indexes(index))
+
+    def flat_indexes(self, index: Tuple[Any, Any]) -> np.ndarray:
+        """Return the flat indexes, into the maps arrays .flat, of the cells a tuple of x and y indexes covers"""
+        axes = [
+            np.arange(*axis_index.indices(size)) if isinstance(axis_index, slice) else np.asarray(axis_index)
+            for axis_index, size in zip(index, (self.width, self.height))
+        ]
+        if any(isinstance(axis_index, slice) for axis_index in index):
+            # Slices index every combination of their x and y, like np.ix_
+            axes = list(np.ix_(*(np.atleast_1d(axis) for axis in axes)))
+        return np.ravel_multi_index(np.broadcast_arrays(*axes), self.tiles.shape).ravel()
+
+    def update_tile_layers(self, index: Any) -> None:
+        """Look up the walkable and transparent layers for the given tiles from the palette"""
+        tile_ids = self.tiles[index]
+
+        self.walkable[index] = tile_types.palette['walkable'][tile_ids]
+        self.transparent[index] = tile_types.palette['transparent'][tile_ids]
+        self.transparency_version += 1
+
+    def index_region(self, index: Tuple[Any, Any]) -> Region:
+        """Return the bounding region of a tuple of x and y indexes"""
+        x_index, y_index = index
+        return axis_bounds(x_index, self.width), axis_bounds(y_index, self.height)
+
+    def region_around(self, x: int, y: int, radius: int) -> Region:
+        """Return the region within radius of a tile, clipped to the map"""
+        return (
+            slice(max(0, x - radius), min(self.width, x + radius + 1)),
+            slice(max(0, y - radius), min(self.height, y + radius + 1)),
+        )
+
+    def mark_dirty(self, region: Region) -> None:
+        """Flag a region to be recomposited on the next render"""
+        if region[0].start >= region[0].stop or region[1].start >= region[1].stop:
+            return
+
+        if self.dirty_region is None:
+            self.dirty_region = region
+            return
+
+        # Grow the dirty region to the bounding box of both
+        dirty_x, dirty_y = self.dirty_region
+        self.dirty_region = (
+            slice(min(dirty_x.start, region[0].start), max(dirty_x.stop, region[0].stop)),
+            slice(min(dirty_y.start, region[1].start), max(dirty_y.stop, region[1].stop)),
+        )
+
+    def track_changes(self) -> MapChanges | None:
+        """Start recording a fresh set of changes and return those recorded until now"""
+        changes, self.changes = self.changes, MapChanges()
+        return changes
+
+    def mark_changed(self, entity: Entity) -> None:
+        """Record that something the journal saves about an entity may have changed"""
+        if self.changes is not None:
+            self.changes.entities.add(entity)
+
+    def update_movement_layers(self, index: Any) -> None:
+        """Recompute the blocked and cost layers over the given tiles"""
+        walkable = self.walkable[index]
+        occupancy = self.occupancy[index]
+
+        self.blocked[index] = ~walkable | (occupancy > 0)
+        self.cost[index] = walkable * (1 + 10 * occupancy)
+        self.movement_version += 1
+
+    def update_occupancy(self, x: int, y: int, change: int) -> None:
+        """Add or remove blocking entities from a tile"""
+        self.occupancy[x, y] += change
+        self.update_movement_layers((x, y))
+
+    def add_entity(self, entity: Entity) -> None:
+        """Add an entity to this map and index it at its current location"""
+        self.entities.add(entity)
+        self.mark_changed(entity)
+        if isinstance(entity, Actor):
+            self.actor_store.add(entity)
+        self.index_entity(entity)
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Remove an entity from this map and from its tile in the index"""
+        self.entities.remove(entity)
+        self.mark_changed(entity)
+        self.unindex_entity(entity)
+        if isinstance(entity, Actor):
+            self.actor_store.remove(entity)
+
+    def relocate_entity(self, entity: Entity, x: int, y: int) -> None:
+        """Move an entity already on this map to a new tile, keeping the index in sync"""
+        self.unindex_entity(entity)
+        # An actor keeps its row, the new position is written to it
+        entity.x = x
+        entity.y = y
+        self.index_entity(entity)
+        self.mark_changed(entity)
+
+    def index_entity(self, entity: Entity) -> None:
+        """Put an entity in the index and occupancy layer at its location"""
+        self.entity_index.setdefault((entity.x, entity.y), set()).add(entity)
+        if entity.blocks_movement:
+            self.update_occupancy(entity.x, entity.y, 1)
+
+    def unindex_entity(self, entity: Entity) -> None:
+        """Take an entity out of the index and occupancy layer at its location"""
+        if entity.blocks_movement:
+            self.update_occupancy(entity.x, entity.y, -1)
+
+        location = (entity.x, entity.y)
+        entities_at_location = self.entity_index[location]
+        entities_at_location.discard(entity)
+        # Don't let empty tiles build up in the index
+        if not entities_at_location:
+            del self.entity_index[location]
+
+    def get_entities_at_location(self, x: int, y: int) -> Set[Entity]:
+        """Return the entities on a tile, this set must not be modified by the caller"""
+        return self.entity_index.get((x, y), set())
+
     def get_blocking_entity_at_location(self, location_x: int, location_y: int) -> Entity | None:
-        for entity in self.entities:
-            if entity.blocks_movement and entity.x == location_x and entity.y == location_y:
+        for entity in self.get_entities_at_location(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Actor | None:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self.get_entities_at_location(x, y):
+            if isinstance(entity, Actor) and entity.is_alive:
+                return entity
         return None
 
+    def get_items_at_location(self, x: int, y: int) -> Iterator[Item]:
+        """Iterate over the items lying on a tile"""
+        yield from (entity for entity in self.get_entities_at_location(x, y) if isinstance(entity, Item))
+
+    def compute_distance_field(self, x: int, y: int) -> np.ndarray:
+        """
+        Return the Dijkstra distance from every tile to (x, y)
+
+        One search covers the whole map, so any number of actors can walk
+        towards the same target by stepping to a neighbour with a lower
+        distance. Unreachable tiles hold the maximum value of the array.
+
+        The result is reused until (x, y) or the movement layers change, so
+        it's shared with the next caller and must not be changed.
+        """
+        key = (x, y, self.movement_version)
+        if self.distance_field is not None and self.distance_field[0] == key:
+            return self.distance_field[1]
+
+        graph = tcod.path.SimpleGraph(cost=self.cost, cardinal=2, diagonal=3)
+        pathfinder = tcod.path.Pathfinder(graph)
+        self.engine.pathfinder_calls += 1
+
+        pathfinder.add_root((x, y))
+        pathfinder.resolve()
+
+        self.distance_field = (key, pathfinder.distance)
+        return pathfinder.distance
+
+    def compute_fov(
+        self, x: int, y: int, radius: int, algorithm: str = fov.DEFAULT_ALGORITHM
+    ) -> Tuple[Region, np.ndarray]:
+        """
+        Return the region within radius of (x, y) and what is visible in it
+
+        The cost depends on the radius and not the size of the map. Results
+        are kept for the last FOV_CACHE_SIZE positions, so waiting or walking
+        back over the same tiles doesn't recompute them. The returned array
+        is shared with the cache and must not be changed.
+        """
+        key = (x, y, radius, algorithm, self.transparency_version)
+        result = self.fov_cache.get(key)
+        if result is not None:
+            self.fov_cache.move_to_end(key)
+            return result
+
+        # Nothing past the radius can be seen or block the view, so the FOV
+        # only needs the window around the viewer rather than the whole map.
+        # A radius of 0 has no limit, as with tcod
+        region = self.region_around(x, y, radius) if radius > 0 else (slice(0, self.width), slice(0, self.height))
+        window_x, window_y = region
+        visible = fov.compute(
+            self.transparent[region],
+            (x - window_x.start, y - window_y.start),
+            radius,
+            algorithm,
+        )
+        result = self.fov_cache[key] = (region, visible)
+
+        if len(self.fov_cache) > FOV_CACHE_SIZE:
+            self.fov_cache.popitem(last=False)
+        return result
+
     # Restricts player to avoid void
     def in_bounds(self, x: int, y: int) -> bool:
         """Returns True if x and y are inside bounds of map"""
         return 0 <= x < self.width and 0 <= y < self.height
 
     # Render map using Console tiles_rgb method
-    def render(self, console: Console) -> None:
+    def render(self, console: Console, camera: Camera) -> None:
         """
-        Render the map based on passable and iterable parameters
+        Render the part of the map in the cameras view based on passable and iterable parameters
 
         Visible:
             Drawn with light colours
@@ -95,34 +426,72 @@ class GameMap:
             Default to the SHROUD type
         """
 
-        # Set the console to be conditionally drawn (np.select) based on
-        # condlist
-        console.tiles_rgb[0 : self.width, 0 : self.height] = np.select(
-            # Check if tile is visibile or explored then uses corresponding
-            # value
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles['light'], self.tiles['dark']],
-            # If neither true in condlist sets default
-            default=tile_types.SHROUD,
-        )
-
-        entities_sorted_for_rendering = sorted(self.entities, key=lambda x: x.render_order.value)
+        view = camera.view
+        view_x, view_y = view
+
+        region: Region | None
+        if view != self.graphics_view:
+            # The camera moved, so recomposite everything it now shows
+            region = view
+            shape = (view_x.stop - view_x.start, view_y.stop - view_y.start)
+            if self.graphics.shape != shape:
+                self.graphics = np.full(shape, fill_value=tile_types.SHROUD, order='F')
+            self.graphics_view = view
+        elif self.dirty_region is not None:
+            # Only recomposite tiles whose visibility or type changed since
+            # the last frame, the rest are still correct in self.graphics.
+            # Changes out of view are picked up when the camera moves
+            region = intersect_regions(self.dirty_region, view)
+        else:
+            region = None
+        self.dirty_region = None
+
+        if region is not None:
+            tile_ids = self.tiles[region]
+            # The same region in self.graphics, which starts at the views corner
+            graphics_region = (
+                slice(region[0].start - view_x.start, region[0].stop - view_x.start),
+                slice(region[1].start - view_y.start, region[1].stop - view_y.start),
+            )
+
+            # Conditionally drawn (np.select) based on condlist
+            self.graphics[graphics_region] = np.select(
+                # Check if tile is visibile or explored then uses corresponding
+                # value
+                condlist=[self.visible[region], self.explored[region]],
+                choicelist=[tile_types.palette['light'][tile_ids], tile_types.palette['dark'][tile_ids]],
+                # If neither true in condlist sets default
+                default=tile_types.SHROUD,
+            )
+
+        console.tiles_rgb[0 : self.graphics.shape[0], 0 : self.graphics.shape[1]] = self.graphics
+
+        # Only entities in the FOV are drawn, so only the visible tiles of the
+        # region the FOV last covered are looked up however big the map is
+        entities_in_view: List[Entity] = []
+        fov_region = intersect_regions(self.fov_region, view)
+        if fov_region is not None:
+            visible_x, visible_y = np.nonzero(self.visible[fov_region])
+            for x, y in zip((visible_x + fov_region[0].start).tolist(), (visible_y + fov_region[1].start).tolist()):
+                entities_in_view.extend(self.entity_index.get((x, y), ()))
+
+        entities_sorted_for_rendering = sorted(entities_in_view, key=lambda x: x.render_order.value)
 
         for entity in entities_sorted_for_rendering:
-            # Only print entities that are in the FOV
-            if self.visible[entity.x, entity.y]:
-                console.print(
-                    x=entity.x,
-                    y=entity.y,
-                    string=entity.char,
-                    fg=entity.colour,
-                )
+            x, y = camera.map_to_screen(entity.x, entity.y)
+            console.print(
+                x=x,
+                y=y,
+                string=entity.char,
+                fg=entity.colour,
+            )
 
 
 class GameWorld:
     """
     Represents the entire game world, including all levels and entities.
-    Holds settings for GameMpa and generates new maps after going down stairs
+    Holds settings for GameMpa and generates new maps after going down stairs,
+    floors the player has left are kept in a FloorCache to go back to
     """
 
     def __init__(
@@ -135,6 +504,9 @@ class GameWorld:
         room_min_size: int,
         room_max_size: int,
         current_floor: int = 0,
+        floors: FloorCache | None = None,
+        seed: int | None = None,
+        pregenerate: bool = False,
     ):
         self.engine = engine
 
@@ -148,16 +520,102 @@ class GameWorld:
 
         self.current_floor = current_floor
 
+        # Floors visited before, the current one is engine.game_map
+        self.floors = floors if floors is not None else FloorCache()
+
+        # Each floor is generated from this and its number, so the same
+        # floor comes out whether it's generated inline or in the worker
+        self.seed = seed if seed is not None else random.getrandbits(64)
+
+        # Generate the next floor down in a worker process, see pregen.py
+        self.pregenerate = pregenerate
+        self.pregenerated: Tuple[int, Future[bytes]] | None = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # A floor still being generated is started again after loading
+        state['pregenerated'] = None
+        return state
+
+    def pregenerate_next_floor(self) -> None:
+        """Start generating the floor below in the worker, if it hasn't been visited"""
+        from pregen import submit
+
+        floor = self.current_floor + 1
+        if not self.pregenerate or floor in self.floors:
+            return
+        if self.pregenerated is not None and self.pregenerated[0] == floor:
+            return
+
+        self.pregenerated = (floor, submit(self, floor))
+
+    def take_pregenerated_floor(self, floor: int) -> GameMap | None:
+        """
+        Return the floor from the worker, or None to generate it here
+
+        A floor the worker has started on is waited for, which takes no
+        longer than generating it again here and leaves the worker free
+        for the next floor rather than busy with one nobody wants.
+        """
+        from floor_cache import load_floor
+
+        if self.pregenerated is None or self.pregenerated[0] != floor:
+            return None
+
+        _, future = self.pregenerated
+        self.pregenerated = None
+        if future.cancel():
+            return None  # Still waiting for the worker to start it
+
+        try:
+            blob = future.result()
+        except Exception:
+            return None  # Generate it here instead if the worker failed
+        return load_floor(blob, self.engine)
+
+    def change_floor(self, floor: int) -> None:
+        """
+        Move the player to another floor
+
+        A floor visited before is restored from the cache, arriving on the
+        stairs the player would have taken. A new floor is generated.
+        """
+        previous_floor = self.current_floor
+        previous_map = self.engine.game_map
+
+        game_map = self.floors.load(floor, self.engine) or self.take_pregenerated_floor(floor)
+        if game_map is None:
+            self.current_floor = floor - 1
+            self.generate_floor()
+        else:
+            self.current_floor = floor
+            self.engine.game_map = game_map
+
+            x, y = game_map.upstairs_location if floor > previous_floor else game_map.downstairs_location
+            self.engine.player.place(x, y, game_map)
+
+        # Stored once the player has left it, so the player isn't saved with it
+        self.floors.store(previous_floor, previous_map)
+
+        self.pregenerate_next_floor()
+
     def generate_floor(self) -> None:
         from procgen import generate_dungeon
 
         self.current_floor += 1
 
-        self.engine.game_map = generate_dungeon(
-            map_width=self.map_width,
-            map_height=self.map_height,
-            max_rooms=self.max_rooms,
-            room_min_size=self.room_min_size,
-            room_max_size=self.room_max_size,
-            engine=self.engine,
-        )
+        # Generate from the floors own seed without disturbing the game's
+        # random numbers
+        state = random.getstate()
+        random.seed(f'{self.seed}:{self.current_floor}')
+        try:
+            self.engine.game_map = generate_dungeon(
+                map_width=self.map_width,
+                map_height=self.map_height,
+                max_rooms=self.max_rooms,
+                room_min_size=self.room_min_size,
+                room_max_size=self.room_max_size,
+                engine=self.engine,
+            )
+        finally:
+            random.setstate(state)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Run the game logic without a window, tileset or menu image
+
+Actions are fed in programmatically and the enemies and FOV are updated
+just like in the real game loop, but nothing is rendered. Use this to
+drive bots or to load test the engine at machine speed:
+
+    python headless.py --turns 10000 --seed 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import TYPE_CHECKING, Callable
+
+import actions
+import input_handlers
+import setup_game
+from components.ai import DIRECTIONS
+
+if TYPE_CHECKING:
+    from actions import Action
+    from engine import Engine
+
+# Picks the players next action from the current game state
+Policy = Callable[['Engine'], 'Action']
+
+
+def random_walk(engine: Engine) -> Action:
+    """Policy that bumps in a random direction, attacking anything in the way"""
+    dx, dy = random.choice(DIRECTIONS)  # noqa: S311
+    return actions.BumpAction(engine.player, dx, dy)
+
+
+class HeadlessGame:
+    """A game session stepped by code rather than by window events."""
+
+    def __init__(self, engine: Engine | None = None, seed: int | None = None, **new_game_settings: int):
+        """
+        Args:
+            engine (Engine, optional): Session to drive, a new game is made
+                with setup_game.new_game if not given
+            seed (int, optional): Seed for the random module so runs repeat
+            new_game_settings: Map settings passed on to setup_game.new_game
+        """
+        if seed is not None:
+            random.seed(seed)
+
+        self.engine = engine if engine is not None else setup_game.new_game(**new_game_settings)
+
+        # Reuse the real handler so actions resolve exactly as in the game
+        self.handler = input_handlers.EventHandler(self.engine)
+
+        self.turns = 0
+        self.elapsed = 0.0
+        # Distance fields and paths searched for over every turn stepped
+        self.pathfinder_calls = 0
+
+    @property
+    def turns_per_second(self) -> float:
+        """Average throughput of every turn stepped so far"""
+        if self.elapsed == 0:
+            return 0.0
+        return self.turns / self.elapsed
+
+    def step(self, action: Action) -> bool:
+        """
+        Perform an action for the player, then the enemy turns and FOV
+
+        Returns True if the action was valid and a turn advanced.
+        """
+        start = time.perf_counter()
+        advanced = self.handler.handle_action(action)
+        self.elapsed += time.perf_counter() - start
+
+        if advanced:
+            self.turns += 1
+            self.pathfinder_calls += self.engine.pathfinder_calls
+        return advanced
+
+    def run(self, policy: Policy = random_walk, max_turns: int = 1000, max_actions: int | None = None) -> float:
+        """
+        Step actions from a policy until max_turns advance or the player dies
+
+        Args:
+            policy (Policy): Returns the next action for the player
+            max_turns (int): Number of turns to advance
+            max_actions (int, optional): Give up after this many attempted
+                actions, defaults to ten per turn
+
+        Returns:
+            float: turns per second over this run
+        """
+        if max_actions is None:
+            max_actions = max_turns * 10
+
+        turns = self.turns
+        elapsed = self.elapsed
+
+        for _ in range(max_actions):
+            if self.turns - turns >= max_turns or not self.engine.player.is_alive:
+                break
+            self.step(policy(self.engine))
+
+        if self.elapsed == elapsed:
+            return 0.0
+        return (self.turns - turns) / (self.elapsed - elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run the game without a window and report throughput.')
+    parser.add_argument('--turns', type=int, default=1000, help='turns to simulate')
+    parser.add_argument('--seed', type=int, default=None, help='seed for a repeatable run')
+    parser.add_argument('--map-width', type=int, default=80)
+    parser.add_argument('--map-height', type=int, default=43)
+    args = parser.parse_args()
+
+    game = HeadlessGame(seed=args.seed, map_width=args.map_width, map_height=args.map_height)
+    turns_per_second = game.run(max_turns=args.turns)
+
+    print(  # noqa: T201
+        f'{game.turns} turns in {game.elapsed:.3f}s ({turns_per_second:.1f} turns/s), '
+        f'{game.pathfinder_calls / max(game.turns, 1):.2f} pathfinder calls/turn, '
+        f'floor {game.engine.game_world.current_floor}, player alive: {game.engine.player.is_alive}'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,16 @@ from __future__ import annotations
 import os
 from typing import TYPE_CHECKING, Callable, Tuple, Union
 
+import numpy as np
 import tcod
 
 import actions
 import colour
 import exceptions
+import journal
+import queries
 from actions import Action, BumpAction, PickupAction, WaitAction
+from message_log import remove_stale_archives
 
 if TYPE_CHECKING:
     from engine import Engine
@@ -150,8 +154,8 @@ class EventHandler(BaseEventHandler):
         return True
 
     def ev_mousemotion(self, event: tcod.event.MouseMotion) -> None:
-        if self.engine.game_map.in_bounds(event.tile.x, event.tile.y):
-            self.engine.mouse_location = event.tile.x, event.tile.y
+        # Kept as a console tile, the map position under it changes when the camera scrolls
+        self.engine.mouse_location = event.tile.x, event.tile.y
 
     def on_render(self, console: tcod.Console) -> None:
         self.engine.render(console)
@@ -377,12 +381,12 @@ class SelectIndexHandler(AskUserEventHandler):
         """Sets the cursor to the player when this handler is constructed."""
         super().__init__(engine)
         player = self.engine.player
-        engine.mouse_location = player.x, player.y
+        engine.mouse_location = engine.camera.map_to_screen(player.x, player.y)
 
     def on_render(self, console: tcod.console) -> None:
         """Highlight the tile under cursor."""
         super().on_render(console)
-        x, y = self.engine.mouse_location
+        x, y = self.engine.camera.map_to_screen(*self.cursor)
         console.tiles_rgb['bg'][x, y] = colour.white
         console.tiles_rgb['fg'][x, y] = colour.black
 
@@ -399,23 +403,30 @@ class SelectIndexHandler(AskUserEventHandler):
             if event.mod & (tcod.event.KMOD_LALT | tcod.event.KMOD_RALT):
                 modifier *= 20
 
-            x, y = self.engine.mouse_location
+            x, y = self.cursor
             dx, dy = MOVE_KEYS[key]
             x += dx * modifier
             y += dy * modifier
-            # Clamp cursor index to map size
-            x = max(0, min(x, self.engine.game_map.width - 1))
-            y = max(0, min(y, self.engine.game_map.height - 1))
-            self.engine.mouse_location = x, y
+            # Clamp cursor index to the part of the map on screen
+            camera = self.engine.camera
+            self.engine.mouse_location = camera.map_to_screen(*camera.clamp(x, y))
             return None
         elif key in CONFIRM_KEYS:
-            return self.on_index_selected(*self.engine.mouse_location)
+            return self.on_index_selected(*self.cursor)
         return super().ev_mousebuttondown(event)
 
+    @property
+    def cursor(self) -> Tuple[int, int]:
+        """Map position of the cursor, kept on the part of the map on screen"""
+        camera = self.engine.camera
+        x, y = self.engine.mouse_location
+        return camera.clamp(x + camera.x, y + camera.y)
+
     def ev_mousebuttondown(self, event: tcod.event.MouseButtonDown) -> ActionOrHandler | None:
         """Left click confirms a selection."""
-        if self.engine.game_map.in_bounds(*event.tile) and event.button == 1:
-            return self.on_index_selected(*event.tile)
+        location = self.engine.camera.screen_to_map(*event.tile)
+        if location is not None and event.button == 1:
+            return self.on_index_selected(*location)
         return super().ev_mousebuttondown(event)
 
     def on_index_selected(self, x: int, y: int) -> ActionOrHandler | None:
@@ -453,20 +464,19 @@ class AreaRangedAttackHandler(SelectIndexHandler):
         self.callback = callback
 
     def on_render(self, console: tcod.Console) -> None:
-        """Highlight the tile under the cursor,"""
+        """Highlight the tile under the cursor and tint the tiles the blast would cover"""
         super().on_render(console)
 
-        x, y = self.engine.mouse_location
+        camera = self.engine.camera
+        cells_x, cells_y = queries.blast_cells(self.engine.game_map, *self.cursor, self.radius)
 
-        # Draw a rectangle around the targeteted area, so player can see what will be affected.
-        console.draw_frame(
-            x=x - self.radius - 1,
-            y=y - self.radius - 1,
-            width=self.radius**2,
-            height=self.radius**2,
-            fg=colour.red,
-            clear=False,
-        )
+        # Only the part of the blast in the cameras view is drawn
+        in_view = camera.in_view_mask(cells_x, cells_y)
+        screen_x, screen_y = camera.map_to_screen(cells_x[in_view], cells_y[in_view])
+
+        # So the player can see what will be affected
+        bg = console.tiles_rgb['bg']
+        bg[screen_x, screen_y] = bg[screen_x, screen_y] // 2 + np.array(colour.red, dtype=np.uint8) // 2
 
     def on_index_selected(self, x: int, y: int) -> Action | None:
         return self.callback((x, y))
@@ -481,8 +491,10 @@ class MainGameEventHandler(EventHandler):
 
         player = self.engine.player
 
-        # Take the stairs
-        if key == tcod.event.K_PERIOD and modifier & (tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT):
+        # Take the stairs, '>' down or '<' up
+        if key in (tcod.event.K_PERIOD, tcod.event.K_COMMA) and modifier & (
+            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT
+        ):
             return actions.TakeStairsAction(player)
 
         if key in MOVE_KEYS:
@@ -520,8 +532,11 @@ class MainGameEventHandler(EventHandler):
 class GameOverEventHandler(EventHandler):
     def on_quit(self) -> None:
         """Handle exiting out of a finished game"""
-        if os.path.exists('savegame.sav'):
-            os.remove('savegame.sav')  # Deletes the active save file
+        # Deletes the active save file, and the journal of changes and message archive beside it
+        for path in ('savegame.sav', journal.journal_path('savegame.sav')):
+            if os.path.exists(path):
+                os.remove(path)
+        remove_stale_archives('savegame.sav', None)
         raise exceptions.QuitWithoutSaving()  # Avoid saving the game
 
     def ev_quit(self, event: tcod.event.Quit) -> None:
@@ -545,7 +560,7 @@ class HistoryViewer(EventHandler):
 
     def __init__(self, engine: Engine):
         super().__init__(engine)
-        self.log_length = len(engine.message_log.messages)
+        self.log_length = len(engine.message_log)
         self.cursor = self.log_length - 1
 
     def on_render(self, console: tcod.Console) -> None:
@@ -564,7 +579,7 @@ class HistoryViewer(EventHandler):
             1,
             log_console.width - 2,
             log_console.height - 2,
-            self.engine.message_log.messages[: self.cursor + 1],
+            self.engine.message_log.history(self.cursor + 1),
         )
         log_console.blit(console, 3, 3)
 
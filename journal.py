@@ -0,0 +1,386 @@
+"""
+Journaled saves: a base snapshot plus an append-only log of changes
+
+Rewriting the whole pickled Engine for every autosave costs the same
+however little happened. Instead the journal writes one full snapshot
+and then, for each later save, appends only what changed since the one
+before: entity positions, HP, inventories, AI state, new messages, and
+changed tiles and explored cells. Every so often, or when something the
+deltas can't describe happens (a new floor, a newly spawned entity), the
+deltas are folded back into a new snapshot.
+
+The map records which entities and cells changed as it happens (see
+GameMap.changes), so capturing a delta only looks at those and not at
+every entity and cell.
+
+Files, for a save called savegame.sav:
+    savegame.sav          the snapshot, a normal save_codecs file
+    savegame.sav.journal  snapshot token, then length prefixed records
+
+Loading replays the journal records whose token matches the snapshot.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import zlib
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+import save_codecs
+from components.ai import ConfusedEnemy, HostileEnemy
+from entity import Actor
+from game_map import GameMap
+from render_order import RenderOrder
+
+if TYPE_CHECKING:
+    from components.ai import BaseAI
+    from engine import Engine
+    from entity import Entity
+
+RECORD_LENGTH = struct.Struct('<I')
+TOKEN_SIZE = 16
+
+
+class UnsupportedChange(Exception):
+    """Raised when a change can't be described by a delta, so a new snapshot is needed."""
+
+
+def journal_path(filename: str) -> str:
+    return filename + '.journal'
+
+
+def unique_cells(indexes: List[np.ndarray]) -> np.ndarray:
+    """Merge arrays of flat cell indexes into one, without repeats"""
+    if not indexes:
+        return np.zeros(0, dtype=np.intp)
+    return np.unique(np.concatenate(indexes))
+
+
+class EntityState(NamedTuple):
+    """Everything a delta can change about an entity, as plain data"""
+
+    # 'map', the registry id of the actor carrying it, or None if gone
+    location: Any
+    x: int
+    y: int
+    char: str
+    colour: Tuple[int, int, int]
+    name: str
+    blocks_movement: bool
+    render_order: str
+    # The rest are only set for actors
+    # (max_hp, hp, base_defense, base_power)
+    fighter: Tuple[int, int, int, int] | None = None
+    # (current_level, current_xp)
+    level: Tuple[int, int] | None = None
+    # Registry ids of the equipped weapon and armour
+    equipped: Tuple[int | None, int | None] | None = None
+    # Registry ids of the carried items
+    inventory: Tuple[int, ...] = ()
+    ai: Any = None
+
+
+def ai_state(ai: BaseAI | None) -> Any:
+    """Describe an AI as plain data"""
+    if ai is None:
+        return None
+    if type(ai) is HostileEnemy:
+        return 'hostile', tuple(ai.path), ai.last_seen
+    if type(ai) is ConfusedEnemy:
+        return 'confused', ai.turns_remaining, ai_state(ai.previous_ai)
+    raise UnsupportedChange(f'Unknown AI {type(ai).__name__}')
+
+
+def build_ai(actor: Actor, state: Any) -> BaseAI | None:
+    """Rebuild an AI described by ai_state"""
+    if state is None:
+        return None
+    if state[0] == 'hostile':
+        ai = HostileEnemy(actor)
+        ai.path = deque(state[1])
+        ai.last_seen = state[2]
+        return ai
+    return ConfusedEnemy(actor, previous_ai=build_ai(actor, state[2]), turns_remaining=state[1])
+
+
+def entity_state(entity: Entity, ids: Dict[Entity, int], game_map: GameMap) -> EntityState:
+    """Describe everything a delta can change about an entity"""
+    parent = entity.parent
+    if parent is game_map:
+        location: Any = 'map' if entity in game_map.entities else None
+    elif isinstance(parent, GameMap):
+        raise UnsupportedChange('Entity on another map')
+    elif entity in parent.items:
+        location = ids[parent.parent]
+    else:
+        # Used up, e.g. a consumed potion
+        location = None
+
+    state = EntityState(
+        location,
+        entity.x,
+        entity.y,
+        entity.char,
+        entity.colour,
+        entity.name,
+        entity.blocks_movement,
+        entity.render_order.name,
+    )
+
+    if isinstance(entity, Actor):
+        fighter = entity.fighter
+        level = entity.level
+        equipment = entity.equipment
+        state = state._replace(
+            fighter=(fighter.max_hp, fighter.hp, fighter.base_defense, fighter.base_power),
+            level=(level.current_level, level.current_xp),
+            equipped=tuple(ids[item] if item else None for item in (equipment.weapon, equipment.armour)),
+            inventory=tuple(ids[item] for item in entity.inventory.items),
+            ai=ai_state(entity.ai),
+        )
+
+    return state
+
+
+def apply_entity_state(entity: Entity, state: EntityState, registry: List[Entity], game_map: GameMap) -> None:
+    """Set an entity back to a state from entity_state"""
+    entity.char, entity.colour, entity.name = state.char, state.colour, state.name
+
+    # Change blocking where the entity is now, so the occupancy layer stays
+    # in step, then take it off the map to move it
+    entity.blocks_movement = state.blocks_movement
+    if entity.parent is game_map and entity in game_map.entities:
+        game_map.remove_entity(entity)
+
+    entity.x, entity.y = state.x, state.y
+    entity.render_order = RenderOrder[state.render_order]
+
+    if isinstance(entity, Actor):
+        # AI first, hp reaching 0 only runs death for an actor that has one
+        entity.ai = build_ai(entity, state.ai)
+        fighter = entity.fighter
+        fighter.max_hp, hp, fighter.base_defense, fighter.base_power = state.fighter
+        fighter.hp = hp
+        entity.level.current_level, entity.level.current_xp = state.level
+        entity.equipment.weapon, entity.equipment.armour = (
+            registry[i] if i is not None else None for i in state.equipped
+        )
+        entity.inventory.items = [registry[i] for i in state.inventory]
+
+    if state.location == 'map':
+        entity.parent = game_map
+        game_map.add_entity(entity)
+    elif state.location is not None:
+        owner = registry[state.location]
+        assert isinstance(owner, Actor)
+        entity.parent = owner.inventory
+
+
+class JournalSnapshot(save_codecs.SnapshotSave):
+    """Write a new snapshot, then start an empty journal for it"""
+
+    def __init__(self, filename: str, snapshot: bytes, codec: str, token: bytes):
+        super().__init__(filename, snapshot, codec)
+        self.token = token
+
+    def commit(self) -> None:
+        super().commit()
+        save_codecs.write_atomic(journal_path(self.filename), self.token)
+
+
+class JournalAppend(save_codecs.PendingSave):
+    """Append one delta record to the journal"""
+
+    def __init__(self, filename: str, delta: Dict[str, Any]):
+        super().__init__(filename)
+        self.delta = delta
+
+    def encode(self) -> None:
+        data = zlib.compress(pickle.dumps(self.delta))
+        self.data = RECORD_LENGTH.pack(len(data)) + data
+
+    def commit(self) -> None:
+        with open(journal_path(self.filename), 'ab') as f:
+            f.write(self.data)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class SaveJournal:
+    """Tracks what was last saved so each save only records what changed since."""
+
+    def __init__(self, filename: str, codec: str = save_codecs.DEFAULT_CODEC, compact_every: int = 50):
+        """
+        Args:
+            filename (str): Snapshot file, the journal is written beside it
+            codec (str): Codec for snapshots, see save_codecs
+            compact_every (int): Fold the deltas into a new snapshot after
+                this many records
+        """
+        self.filename = filename
+        self.codec = codec
+        self.compact_every = compact_every
+
+        # State as of the last record, compared against on the next one
+        self.engine: Engine | None = None
+        self.game_map: GameMap | None = None
+        self.registry: List[Entity] = []
+        self.ids: Dict[Entity, int] = {}
+        self.states: List[EntityState] = []
+        self.message_count = 0
+        self.records = 0
+
+    def record(self, engine: Engine) -> save_codecs.PendingSave:
+        """
+        Capture what changed since the last record, on the main thread
+
+        Returns the save to encode and commit, a delta to append or a new
+        snapshot when compacting.
+        """
+        if engine is not self.engine or engine.game_map is not self.game_map or self.records >= self.compact_every:
+            return self.snapshot(engine)
+
+        try:
+            delta = self.delta(engine)
+        except (UnsupportedChange, KeyError):
+            # KeyError is an item or owner that wasn't in the snapshot
+            return self.snapshot(engine)
+
+        self.records += 1
+        return JournalAppend(self.filename, delta)
+
+    def snapshot(self, engine: Engine) -> save_codecs.PendingSave:
+        """Start over from a full snapshot of the engine"""
+        game_map = engine.game_map
+
+        # Everything a delta can refer to: the entities on the map and the
+        # items carried by its actors
+        registry: List[Entity] = list(game_map.entities)
+        for actor in game_map.actors:
+            registry.extend(actor.inventory.items)
+
+        token = os.urandom(TOKEN_SIZE)
+        snapshot = pickle.dumps({'engine': engine, 'registry': registry, 'token': token})
+
+        # Stop tracking the map left behind and start over on this one
+        if self.game_map is not None and self.game_map is not game_map:
+            self.game_map.changes = None
+        game_map.track_changes()
+
+        self.engine = engine
+        self.game_map = game_map
+        self.registry = registry
+        self.ids = {entity: i for i, entity in enumerate(registry)}
+        self.states = [entity_state(entity, self.ids, game_map) for entity in registry]
+        self.message_count = len(engine.message_log)
+        self.records = 0
+
+        return JournalSnapshot(self.filename, snapshot, self.codec, token)
+
+    def delta(self, engine: Engine) -> Dict[str, Any]:
+        """Return everything that changed since the last record"""
+        game_map = engine.game_map
+        changes = game_map.track_changes()
+        assert changes is not None
+
+        # The player is always saved, along with whatever each changed actor
+        # carries or carried, as items are used up and equipped without
+        # anything else about them changing
+        changed = changes.entities | {engine.player}
+        for entity in list(changed):
+            if isinstance(entity, Actor):
+                changed.update(entity.inventory.items)
+                if entity in self.ids:
+                    changed.update(self.registry[i] for i in self.states[self.ids[entity]].inventory)
+
+        entities = {}
+        for entity in changed:
+            i = self.ids.get(entity)
+            if i is None:
+                # Anything new can't be described by a delta
+                raise UnsupportedChange('New entity')
+            state = entity_state(entity, self.ids, game_map)
+            if state != self.states[i]:
+                entities[i] = self.states[i] = state
+
+        tiles = unique_cells(changes.tiles)
+        explored = unique_cells(changes.explored)
+
+        # New messages, newest first, followed by the last one saved as
+        # its stack count may have gone up since
+        message_log = engine.message_log
+        new_count = len(message_log) - self.message_count
+        recent = list(islice(reversed(message_log.history()), new_count + 1))
+        messages = [(message.plain_text, message.fg, message.count) for message in reversed(recent[:new_count])]
+        last_count = recent[new_count].count if len(recent) > new_count else 0
+
+        self.message_count = len(message_log)
+
+        return {
+            'turn': engine.turn,
+            'entities': dict(sorted(entities.items())),
+            'tiles': (tiles, game_map.tiles.flat[tiles]),
+            'explored': explored,
+            'last_message_count': last_count,
+            'messages': messages,
+        }
+
+
+def restore(data: Dict[str, Any], filename: str) -> Engine:
+    """Rebuild an engine from a journal snapshot and replay its journal"""
+    engine: Engine = data['engine']
+    registry: List[Entity] = data['registry']
+    game_map = engine.game_map
+
+    path = journal_path(filename)
+    if not os.path.exists(path):
+        return engine
+
+    with open(path, 'rb') as f:
+        journal = f.read()
+
+    # A journal left over from another snapshot doesn't apply
+    if journal[:TOKEN_SIZE] != data['token']:
+        return engine
+
+    position = TOKEN_SIZE
+    while position + RECORD_LENGTH.size <= len(journal):
+        (length,) = RECORD_LENGTH.unpack_from(journal, position)
+        position += RECORD_LENGTH.size
+        if position + length > len(journal):
+            break  # Cut short mid write, stop at the last whole record
+
+        # The journal is only ever written by SaveJournal beside a save the player already trusts
+        delta = pickle.loads(zlib.decompress(journal[position : position + length]))  # noqa: S301
+        position += length
+
+        apply_delta(engine, registry, game_map, delta)
+
+    engine.update_fov()
+    return engine
+
+
+def apply_delta(engine: Engine, registry: List[Entity], game_map: GameMap, delta: Dict[str, Any]) -> None:
+    """Replay one journal record"""
+    engine.turn = delta['turn']
+
+    for i, state in delta['entities'].items():
+        apply_entity_state(registry[i], state, registry, game_map)
+
+    tiles, values = delta['tiles']
+    if len(tiles):
+        game_map.set_tiles(np.unravel_index(tiles, game_map.tiles.shape), values)
+    game_map.explored.flat[delta['explored']] = True
+
+    message_log = engine.message_log
+    if message_log.messages and delta['last_message_count']:
+        message_log.messages[-1].count = delta['last_message_count']
+    for text, fg, count in delta['messages']:
+        message_log.add_message(text, fg, stack=False)
+        message_log.messages[-1].count = count
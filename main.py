@@ -7,6 +7,7 @@ import colour
 import exceptions
 import input_handlers
 import setup_game
+from autosave import Autosaver
 
 
 def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
@@ -32,6 +33,9 @@ def main() -> None:
 
     handler: input_handlers.BaseEventHandler = setup_game.MainMenu()
 
+    # Saves every so often in the background while playing
+    autosaver = Autosaver('savegame.sav', journal=True)
+
     # Create the screen
     # Definisng vsync is slightly redundant but all the best
     # games have it!!
@@ -62,12 +66,19 @@ def main() -> None:
                     # Then print the error to the message log
                     if isinstance(handler, input_handlers.EventHandler):
                         handler.engine.message_log.add_message(traceback.format_exc(), colour.error)
+
+                autosaver.update(handler)
         except exceptions.QuitWithoutSaving:
+            # Don't let an autosave still being written bring the save back
+            autosaver.cancel()
             raise
         except SystemExit:  # Save and quit
+            # Finish any autosave first so it can't overwrite this newer save
+            autosaver.wait()
             save_game(handler, 'savegame.sav')
             raise
         except BaseException:  # Save on any other unexpected error
+            autosaver.wait()
             save_game(handler, 'savegame.sav')
             raise
 
@@ -1,17 +1,46 @@
-from typing import List, Reversible, Tuple, Iterable
+from __future__ import annotations
+
+import glob
+import os
+import struct
 import textwrap
+from array import array
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Reversible, Tuple
 
 import tcod
 
 import colour
 
+# Archive record header: fg colour, stack count and length of the utf-8 text
+RECORD_HEADER = struct.Struct('<3BII')
+
+# How many archived messages are read from disk at a time when paging back
+ARCHIVE_READ_CHUNK = 64
+
 
 class Message:
+    __slots__ = ('plain_text', 'fg', 'count', '_wrapped', '_wrapped_count')
+
     def __init__(self, text: str, fg: Tuple[int, int, int]):
         self.plain_text = text
         self.fg = fg
         self.count = 1
 
+        # Wrapped lines by width, only valid for the count they were made at
+        self._wrapped: Dict[int, List[str]] = {}
+        self._wrapped_count = self.count
+
+    def __getstate__(self) -> Tuple[str, Tuple[int, int, int], int]:
+        # Don't save the wrapping cache, it's rebuilt when drawn
+        return self.plain_text, self.fg, self.count
+
+    def __setstate__(self, state: Tuple[str, Tuple[int, int, int], int]) -> None:
+        self.plain_text, self.fg, self.count = state
+        self._wrapped = {}
+        self._wrapped_count = self.count
+
     @property
     def full_text(self) -> str:
         """The full text of this message, including count if needed"""
@@ -19,10 +48,163 @@ class Message:
             return f"{self.plain_text} (x{self.count})"
         return self.plain_text
 
+    def wrap(self, width: int) -> List[str]:
+        """Return the full text wrapped to width, cached until the count changes"""
+        if self._wrapped_count != self.count:
+            self._wrapped.clear()
+            self._wrapped_count = self.count
+
+        lines = self._wrapped.get(width)
+        if lines is None:
+            lines = self._wrapped[width] = list(MessageLog.wrap(self.full_text, width))
+        return lines
+
+
+def new_archive_path(save_filename: str) -> str:
+    """
+    Return an archive file for a new game to be saved as save_filename
+
+    Each game gets its own, so starting a new one can't write over the
+    archive an existing save still points into.
+    """
+    return f'{save_filename}.{os.urandom(4).hex()}.log'
+
+
+def remove_stale_archives(save_filename: str, keep: str | None) -> None:
+    """Delete the archives of earlier games saved as save_filename, once the save no longer uses them"""
+    for path in glob.glob(glob.escape(save_filename) + '.*.log'):
+        if keep is None or os.path.abspath(path) != os.path.abspath(keep):
+            os.remove(path)
+
+
+class MessageArchive:
+    """
+    Append-only file of messages that no longer fit in the log
+
+    Only the file offset of each record is kept in memory, messages are
+    read back from disk when paged to.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets = array('Q')
+        self.end = 0
+
+        # Start a new archive for a new log
+        open(self.path, 'wb').close()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def append(self, messages: Iterable[Message]) -> None:
+        """Write messages to the end of the archive"""
+        # Write from our own end, a save loaded from earlier in the game
+        # can leave later records past it which are written over
+        mode = 'r+b' if os.path.exists(self.path) else 'wb'
+        with open(self.path, mode) as f:
+            f.seek(self.end)
+            for message in messages:
+                text = message.plain_text.encode('utf-8')
+                self.offsets.append(self.end)
+                f.write(RECORD_HEADER.pack(*message.fg, message.count, len(text)))
+                f.write(text)
+                self.end += RECORD_HEADER.size + len(text)
+
+    def read(self, start: int, stop: int) -> List[Message]:
+        """
+        Read the archived messages from start up to stop
+
+        Returns nothing if the file no longer holds them, e.g. it was
+        deleted or cut short since the offsets were saved.
+        """
+        if start >= stop:
+            return []
+
+        end = self.offsets[stop] if stop < len(self.offsets) else self.end
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < end:
+                    return []
+                f.seek(self.offsets[start])
+                data = f.read(end - self.offsets[start])
+        except FileNotFoundError:
+            return []
+
+        messages = []
+        position = 0
+        while position < len(data):
+            r, g, b, count, length = RECORD_HEADER.unpack_from(data, position)
+            position += RECORD_HEADER.size
+
+            message = Message(data[position : position + length].decode('utf-8'), (r, g, b))
+            message.count = count
+            messages.append(message)
+            position += length
+
+        return messages
+
+
+class MessageHistory:
+    """
+    Lazy view of the first `stop` messages of a log, archived ones included
+
+    Iterating in reverse only reads as far back in the archive as the
+    caller gets, so rendering a page doesn't load the whole history.
+    """
+
+    def __init__(self, log: MessageLog, stop: int):
+        self.log = log
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop
+
+    def __reversed__(self) -> Iterator[Message]:
+        archived = len(self.log.archive) if self.log.archive is not None else 0
+
+        # Newest first from the messages still in memory
+        in_memory = max(0, self.stop - archived)
+        yield from islice(reversed(self.log.messages), len(self.log.messages) - in_memory, None)
+
+        if self.log.archive is None:
+            return
+
+        # Then back through the archive a chunk at a time
+        stop = min(self.stop, archived)
+        while stop > 0:
+            start = max(0, stop - ARCHIVE_READ_CHUNK)
+            messages = self.log.archive.read(start, stop)
+            if not messages:
+                return  # The archive file is gone or was cut short
+            yield from reversed(messages)
+            stop = start
+
 
 class MessageLog:
-    def __init__(self) -> None:
-        self.messages: List[Message] = []
+    def __init__(self, capacity: int = 1024, archive_path: str | None = None) -> None:
+        """
+        Args:
+            capacity (int): Most messages kept in memory, older ones are
+                spilled to the archive
+            archive_path (str, optional): File to archive older messages
+                to, without one they are dropped
+        """
+        self.messages: Deque[Message] = deque()
+        self.capacity = capacity
+        self.archive = MessageArchive(archive_path) if archive_path else None
+
+    @property
+    def archive_path(self) -> str | None:
+        return self.archive.path if self.archive is not None else None
+
+    def __len__(self) -> int:
+        """Number of messages in the full history, archived ones included"""
+        archived = len(self.archive) if self.archive is not None else 0
+        return archived + len(self.messages)
+
+    def history(self, stop: int | None = None) -> MessageHistory:
+        """Return a lazy view of the full history up to stop"""
+        return MessageHistory(self, len(self) if stop is None else stop)
 
     def add_message(
         self,
@@ -47,6 +229,17 @@ class MessageLog:
         else:
             self.messages.append(Message(text, fg))
 
+        if len(self.messages) > self.capacity:
+            self.spill()
+
+    def spill(self) -> None:
+        """Move the oldest messages out of memory and into the archive"""
+        # Spill a quarter of the log at once so the archive file isn't
+        # opened for every new message
+        spilled = [self.messages.popleft() for _ in range(max(1, self.capacity // 4))]
+        if self.archive is not None:
+            self.archive.append(spilled)
+
     def render(
         self, console: tcod.console.Console, x: int, y: int, width: int, height: int
     ) -> None:
@@ -89,7 +282,7 @@ class MessageLog:
         y_offset = height - 1
 
         for message in reversed(messages):
-            for line in reversed(list(cls.wrap(message.full_text, width))):
+            for line in reversed(message.wrap(width)):
                 console.print(x=x, y=y + y_offset, string=line, fg=message.fg)
                 y_offset -= 1
                 # No more space for messages
@@ -0,0 +1,67 @@
+"""
+Generate the next floor in a worker process while the current one is played
+
+Every floor is generated from a seed made from the worlds seed and the
+floor number, so a floor generated in the worker is the same floor that
+would have been generated inline. The worker sends the floor back as a
+blob from floor_cache.dump_floor, taking the stairs then only has to
+unpickle it, falling back to generating inline if it isn't ready yet.
+"""
+
+from __future__ import annotations
+
+import functools
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict
+
+import entity_factories
+import floor_cache
+from engine import Engine
+from game_map import GameWorld
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+
+
+@functools.cache
+def get_executor() -> ProcessPoolExecutor:
+    """The worker process, only started the first time a floor is pregenerated"""
+    return ProcessPoolExecutor(max_workers=1)
+
+
+def generate_standalone_floor(settings: Dict[str, int], seed: int, floor: int) -> GameMap:
+    """
+    Generate a floor of a world outside of any game
+
+    The floor belongs to a throwaway engine and has no player on it,
+    settings are GameWorlds map and room size arguments.
+    """
+    engine = Engine(player=entity_factories.player.build())
+    engine.game_world = GameWorld(engine=engine, seed=seed, current_floor=floor - 1, **settings)
+    engine.game_world.generate_floor()
+
+    game_map = engine.game_map
+    game_map.remove_entity(engine.player)
+    return game_map
+
+
+def generate_floor_blob(settings: Dict[str, int], seed: int, floor: int) -> bytes:
+    """Generate a floor of a world and return it as a blob, run in the worker"""
+    # The real player is placed on the stairs when the floor is swapped in
+    return floor_cache.dump_floor(generate_standalone_floor(settings, seed, floor), 'none')
+
+
+def world_settings(game_world: GameWorld) -> Dict[str, int]:
+    """The map and room size arguments of a GameWorld"""
+    return {
+        'map_width': game_world.map_width,
+        'map_height': game_world.map_height,
+        'max_rooms': game_world.max_rooms,
+        'room_min_size': game_world.room_min_size,
+        'room_max_size': game_world.room_max_size,
+    }
+
+
+def submit(game_world: GameWorld, floor: int) -> Future[bytes]:
+    """Start generating a floor of a world in the worker"""
+    return get_executor().submit(generate_floor_blob, world_settings(game_world), game_world.seed, floor)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import random
-from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
+import numpy as np
 import tcod
 
 import entity_factories
@@ -12,6 +13,7 @@ from game_map import GameMap
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
+    from template import Template
 
 
 max_items_per_floor = [(1, 1), (4, 2)]
@@ -19,14 +21,14 @@ max_items_per_floor = [(1, 1), (4, 2)]
 max_monsters_per_floor = [(1, 2), (4, 3), (6, 5)]
 
 
-item_chances: Dict[int, List[Tuple[Entity, int]]] = {
+item_chances: Dict[int, List[Tuple[Template[Entity], int]]] = {
     0: [(entity_factories.health_potion, 35)],
     2: [(entity_factories.confusion_scroll, 10)],
     4: [(entity_factories.lightning_scroll, 25), (entity_factories.sword, 5)],
     6: [(entity_factories.fireball_scroll, 25), (entity_factories.chain_mail, 15)],
 }
 
-enemy_chances: Dict[int, List[Tuple[Entity, int]]] = {
+enemy_chances: Dict[int, List[Tuple[Template[Entity], int]]] = {
     0: [(entity_factories.orc, 80)],
     3: [(entity_factories.troll, 15)],
     5: [(entity_factories.troll, 30)],
@@ -47,10 +49,10 @@ def get_max_value_for_floor(weighted_chance_by_floor: List[Tuple[int, int]], flo
 
 
 def get_entities_at_random(
-    weighted_chances_by_floor: Dict[int, List[Tuple[Entity, int]]],
+    weighted_chances_by_floor: Dict[int, List[Tuple[Template[Entity], int]]],
     number_of_entities: int,
     floor: int,
-) -> List[Entity]:
+) -> List[Template[Entity]]:
     entity_weighted_chances = {}
 
     for key, values in weighted_chances_by_floor.items():
@@ -98,6 +100,15 @@ class RectangularRoom:
         # between rooms
         return slice(self.x1 + 1, self.x2), slice(self.y1 + 1, self.y2)
 
+    # Every cell the room covers, walls included, as a 2D array index
+    @property
+    def bounds(self) -> Tuple[slice, slice]:
+        """
+        Returns the whole room as 2D array index, two rooms intersect when
+        their bounds share a cell
+        """
+        return slice(self.x1, self.x2 + 1), slice(self.y1, self.y2 + 1)
+
     # want rooms to be independant with tunnels without overlap
     def intersects(self, other: RectangularRoom) -> bool:
         """
@@ -116,13 +127,13 @@ def place_entities(
     num_Monsters = random.randint(0, get_max_value_for_floor(max_monsters_per_floor, floor_number))  # noqa: S311
     num_items = random.randint(0, get_max_value_for_floor(max_items_per_floor, floor_number))  # noqa: S311
 
-    monsters: List[Entity] = get_entities_at_random(
+    monsters: List[Template[Entity]] = get_entities_at_random(
         enemy_chances,
         num_Monsters,
         floor_number,
     )
 
-    items: List[Entity] = get_entities_at_random(
+    items: List[Template[Entity]] = get_entities_at_random(
         item_chances,
         num_items,
         floor_number,
@@ -132,13 +143,13 @@ def place_entities(
         x = random.randint(room.x1 + 1, room.x2 - 1)
         y = random.randint(room.y1 + 1, room.y2 - 1)
 
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
+        if not dungeon.get_entities_at_location(x, y):
             entity.spawn(dungeon, x, y)
 
 
-# Take 2 sets of x, y and return iterator of 2 tuples of ints
-def tunnel_between(start: Tuple[int, int], end: Tuple[int, int]) -> Iterator[Tuple[int, int]]:
-    """Return an L-shaped tunnel between two points"""
+# Take 2 sets of x, y and return the tunnels coordinates as arrays
+def tunnel_between(start: Tuple[int, int], end: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return an L-shaped tunnel between two points as x and y index arrays"""
     x1, y1 = start
     x2, y2 = end
 
@@ -150,13 +161,15 @@ def tunnel_between(start: Tuple[int, int], end: Tuple[int, int]) -> Iterator[Tup
         corner_x, corner_y = x1, y2
 
     # Generate this tunnel, use line of sight algorithm (Bresenhams lines)
-    # get line from one set to another
-    # Yield returns the values but keeps the state rather then closing it
-    # off, picks up where we left off when called again
-    for x, y in tcod.los.bresenham((x1, y1), (corner_x, corner_y)).tolist():
-        yield x, y
-    for x, y in tcod.los.bresenham((corner_x, corner_y), (x2, y2)).tolist():
-        yield x, y
+    # get line from one set to another. Both legs come back as (length, 2)
+    # arrays, so the whole tunnel is carved with one fancy index
+    tunnel = np.concatenate(
+        [
+            tcod.los.bresenham((x1, y1), (corner_x, corner_y)),
+            tcod.los.bresenham((corner_x, corner_y), (x2, y2)),
+        ]
+    )
+    return tunnel[:, 0], tunnel[:, 1]
 
 
 # //TODO: We currently toss coliding rooms, more elegant to augment?
@@ -174,8 +187,8 @@ def generate_dungeon(
     dungeon = GameMap(engine, map_width, map_height, entities=[player])
 
     rooms: List[RectangularRoom] = []
-
-    center_of_last_room = (0, 0)
+    # Cells covered by accepted rooms, edges included
+    claimed = np.zeros((map_width, map_height), dtype=bool, order='F')
 
     for r in range(max_rooms):
         room_width = random.randint(room_min_size, room_max_size)
@@ -188,13 +201,15 @@ def generate_dungeon(
         # TODO: add more options in the future
         new_room = RectangularRoom(x, y, room_width, room_height)
 
-        # Check if it intersets any current rooms
-        if any(new_room.intersects(other_room) for other_room in rooms):
+        # Check if it intersets any current rooms, by looking at the cells
+        # they cover rather than comparing against every room
+        if claimed[new_room.bounds].any():
             continue  # This rom intersects so next attempt
+        claimed[new_room.bounds] = True
 
         # No intersetions means valid room
         # Dig it out
-        dungeon.tiles[new_room.inner] = tile_types.floor
+        dungeon.set_tiles(new_room.inner, tile_types.floor)
 
         # First room generated, so player start
         if len(rooms) == 0:
@@ -203,19 +218,24 @@ def generate_dungeon(
         # All other rooms except first
         else:
             # Dig between this and previous room
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
-                dungeon.tiles[x, y] = tile_types.floor
-
-            center_of_last_room = new_room.center
+            dungeon.set_tiles(tunnel_between(rooms[-1].center, new_room.center), tile_types.floor)
 
         # Place entities in the room
         place_entities(new_room, dungeon, engine.game_world.current_floor)
 
-        # Add the down stairs to the last room
-        dungeon.tiles[center_of_last_room] = tile_types.down_stairs
-        dungeon.downstairs_location = center_of_last_room
-
         # Append to list of rooms
         rooms.append(new_room)
 
+    # Stairs back up where the player arrives, after the tunnels so none dig over them
+    if rooms and engine.game_world.current_floor > 1:
+        dungeon.set_tiles(rooms[0].center, tile_types.up_stairs)
+        dungeon.upstairs_location = rooms[0].center
+
+    # Add the down stairs to the last room, once it's known which it is. With
+    # only one room they share it with the up stairs, and the way on is shown
+    if rooms:
+        dungeon.set_tiles(rooms[-1].center, tile_types.down_stairs)
+        dungeon.downstairs_location = rooms[-1].center
+
+    dungeon.rooms = rooms
     return dungeon
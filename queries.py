@@ -0,0 +1,99 @@
+"""
+Queries over the actors and tiles of a map
+
+Area of effect targeting asks which tiles a blast covers and who is
+standing in them, and single target spells ask for the nearest actor in
+sight. Both are answered with array math over the maps ActorStore (see
+actor_store.py) rather than by measuring the distance to each actor in
+turn, so they cost about the same with ten actors on the map or ten
+thousand.
+
+Distances are Euclidean: a tile is within radius r of (x, y) when
+dx ** 2 + dy ** 2 <= r ** 2. The tiles within a radius are kept as a
+mask worked out once per radius, which both the highlight drawn while
+aiming and the actors hit are read from, so what's shown is what's hit.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, List, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Actor
+    from game_map import GameMap
+
+
+@functools.cache
+def radius_mask(radius: float) -> np.ndarray:
+    """
+    Mask of the offsets within radius of a centre tile
+
+    The mask is (2 * r + 1, 2 * r + 1) where r is the radius rounded down,
+    cell [dx + r, dy + r] is True if offset (dx, dy) is within the radius.
+    It's shared between callers and read only.
+    """
+    reach = int(radius)
+    dx, dy = np.ogrid[-reach : reach + 1, -reach : reach + 1]
+    mask = dx**2 + dy**2 <= radius**2
+    mask.flags.writeable = False
+    return mask
+
+
+def blast_cells(game_map: GameMap, x: int, y: int, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the x and y of every map tile within radius of (x, y)"""
+    mask = radius_mask(radius)
+    reach = mask.shape[0] // 2
+
+    # The part of the mask over the map
+    region_x, region_y = game_map.region_around(x, y, reach)
+    window = mask[
+        region_x.start - x + reach : region_x.stop - x + reach,
+        region_y.start - y + reach : region_y.stop - y + reach,
+    ]
+    cells_x, cells_y = np.nonzero(window)
+    return cells_x + region_x.start, cells_y + region_y.start
+
+
+def actors_within(game_map: GameMap, x: int, y: int, radius: float) -> List[Actor]:
+    """Return the living actors within radius of (x, y), the ones a blast there would hit"""
+    actor_store = game_map.actor_store
+    mask = radius_mask(radius)
+    size = mask.shape[0]
+
+    # Each actors offset as an index into the mask, only those inside the
+    # masks square are looked up
+    mask_x = actor_store.x - x + size // 2
+    mask_y = actor_store.y - y + size // 2
+    nearby = actor_store.living & (mask_x >= 0) & (mask_x < size) & (mask_y >= 0) & (mask_y < size)
+
+    hit = np.zeros_like(nearby)
+    hit[nearby] = mask[mask_x[nearby], mask_y[nearby]]
+    return actor_store.select(hit)
+
+
+def nearest_visible_actor(
+    game_map: GameMap, x: int, y: int, max_range: float, exclude: Actor | None = None
+) -> Actor | None:
+    """
+    Return the closest living actor on a visible tile, None if there isn't one
+
+    Like the lightning scroll always has, anything closer than
+    max_range + 1 counts as in range. When two actors are as close as
+    each other the one with the lowest row in the actor store is picked.
+    """
+    actor_store = game_map.actor_store
+
+    candidates = actor_store.living & game_map.visible[actor_store.x, actor_store.y]
+    if exclude is not None and exclude in actor_store:
+        candidates[exclude.row] = False
+
+    distance = actor_store.distance_squared(x, y)
+    candidates &= distance < (max_range + 1.0) ** 2
+    if not candidates.any():
+        return None
+
+    row = int(np.argmin(np.where(candidates, distance, np.iinfo(distance.dtype).max)))
+    return actor_store.actors[row]
@@ -35,15 +35,18 @@ def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
     if not game_map.in_bounds(x, y) or not game_map.visible[x, y]:
         return ''
 
-    names = ', '.join(entity.name for entity in game_map.entities if entity.x == x and entity.y == y)
+    names = ', '.join(entity.name for entity in game_map.get_entities_at_location(x, y))
 
     return names.capitalize()
 
 
 # grabs mouse location and passes to get_names...
 def render_names_at_mouse_location(console: Console, x: int, y: int, engine: Engine) -> None:
-    mouse_x, mouse_y = engine.mouse_location
+    # The mouse is kept as a console tile, the camera says what part of the map is under it now
+    location = engine.camera.screen_to_map(*engine.mouse_location)
+    if location is None:
+        return
 
-    names_at_mouse_location = get_names_at_location(x=mouse_x, y=mouse_y, game_map=engine.game_map)
+    names_at_mouse_location = get_names_at_location(*location, game_map=engine.game_map)
 
     console.print(x=x, y=y, string=names_at_mouse_location)
@@ -0,0 +1,155 @@
+"""
+Compression codecs for save files
+
+A save starts with a small header naming the codec it was written with,
+so saves made with any codec can be loaded:
+
+    b'RLSV' | version (1 byte) | codec length (1 byte) | codec (ascii) | data
+
+A codec is given as a name with an optional level, e.g. 'zlib', 'lzma:0'
+or 'bz2:9'. The codec used for saving defaults to DEFAULT_CODEC, which
+can be set with the ROGUE_SAVE_CODEC environment variable and is checked
+when the module is imported.
+"""
+
+from __future__ import annotations
+
+import bz2
+import functools
+import lzma
+import os
+import stat
+import tempfile
+import zlib
+from typing import Callable, Dict, Tuple
+
+MAGIC = b'RLSV'
+VERSION = 1
+
+# Name -> (compress(data, level), decompress(data), default level)
+CODECS: Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes], int]] = {
+    'none': (lambda data, level: data, lambda data: data, 0),
+    'zlib': (lambda data, level: zlib.compress(data, level), zlib.decompress, 6),
+    'bz2': (lambda data, level: bz2.compress(data, level), bz2.decompress, 9),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress, 6),
+}
+
+
+def parse_codec(codec: str) -> Tuple[str, int]:
+    """Split a codec into its name and level, filling in the default level"""
+    name, _, level = codec.partition(':')
+    if name not in CODECS:
+        raise ValueError(f'Unknown save codec {codec!r}, expected one of {", ".join(CODECS)}')
+    if level and not level.isdigit():
+        raise ValueError(f'Invalid level in save codec {codec!r}, expected a number after the colon')
+    return name, int(level) if level else CODECS[name][2]
+
+
+def codec_from_environment() -> str:
+    """Return the codec named by ROGUE_SAVE_CODEC, so a bad one fails at start up rather than on the first save"""
+    codec = os.environ.get('ROGUE_SAVE_CODEC', 'lzma')
+    try:
+        parse_codec(codec)
+    except ValueError as exc:
+        raise ValueError(f'ROGUE_SAVE_CODEC: {exc}') from None
+    return codec
+
+
+DEFAULT_CODEC = codec_from_environment()
+
+
+def encode(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    """Compress data with a codec and prefix the header"""
+    name, level = parse_codec(codec)
+    compress = CODECS[name][0]
+
+    codec_name = f'{name}:{level}'.encode('ascii')
+    header = MAGIC + bytes([VERSION, len(codec_name)]) + codec_name
+    return header + compress(data, level)
+
+
+def split_header(blob: bytes) -> Tuple[str, bytes]:
+    """Return the codec a save was written with and its compressed data"""
+    if not blob.startswith(MAGIC):
+        # Saves from before the header were always plain lzma
+        return 'lzma', blob
+
+    version = blob[len(MAGIC)]
+    if version != VERSION:
+        raise ValueError(f'Unsupported save version {version}')
+
+    codec_length = blob[len(MAGIC) + 1]
+    start = len(MAGIC) + 2
+    return blob[start : start + codec_length].decode('ascii'), blob[start + codec_length :]
+
+
+def decode(blob: bytes) -> bytes:
+    """Return the decompressed data of a save, whatever codec it was written with"""
+    codec, data = split_header(blob)
+    name, _ = parse_codec(codec)
+    return CODECS[name][1](data)
+
+
+def write_atomic(filename: str, data: bytes) -> None:
+    """
+    Write data to a file so readers only ever see the old or the new file
+
+    The data goes to a temporary file beside it which then replaces the
+    old file in one step, so a crash mid write can't corrupt a save. The
+    file keeps the permissions it had, or gets the usual ones if new.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        mode = new_file_mode()
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.NamedTemporaryFile(dir=directory, prefix='.save-', delete=False) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Temporary files are only readable by us
+    os.chmod(f.name, mode)
+    os.replace(f.name, filename)
+
+
+@functools.cache
+def new_file_mode() -> int:
+    """Permissions open() gives a new file under the process umask"""
+    # The umask can only be read by setting it, so it's read once
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class PendingSave:
+    """
+    A save captured on the main thread to be finished on another
+
+    encode does the slow work of turning what was captured into the bytes
+    in data, commit writes them over the file and may be skipped if the
+    save is cancelled in between.
+    """
+
+    def __init__(self, filename: str, data: bytes = b''):
+        self.filename = filename
+        self.data = data
+
+    def encode(self) -> None:
+        pass
+
+    def commit(self) -> None:
+        write_atomic(self.filename, self.data)
+
+
+class SnapshotSave(PendingSave):
+    """A whole pickled engine, compressed and written over the save file"""
+
+    def __init__(self, filename: str, snapshot: bytes, codec: str = DEFAULT_CODEC):
+        super().__init__(filename)
+        self.snapshot = snapshot
+        self.codec = codec
+
+    def encode(self) -> None:
+        self.data = encode(self.snapshot, self.codec)
@@ -2,35 +2,48 @@
 
 from __future__ import annotations
 
-import copy
-import lzma
+import functools
 import pickle
 import traceback
 
+import numpy as np
 import tcod
 
 import colour
 import entity_factories
 import input_handlers
+import journal
+import save_codecs
 from engine import Engine
 from game_map import GameWorld
+from message_log import new_archive_path
 
-# Load the background image and remove alpha channel
-background_image = tcod.image.load('menu_background.png')[:, :, :3]
 
+@functools.cache
+def get_background_image() -> np.ndarray:
+    """Load the background image and remove alpha channel, only once the menu is shown."""
+    return tcod.image.load('menu_background.png')[:, :, :3]
 
-def new_game() -> Engine:
-    """Return a brand new game session as an Engine instance."""
-    map_width = 80
-    map_height = 43
 
-    room_max_size = 10
-    room_min_size = 6
-    max_rooms = 30
+def new_game(
+    *,
+    map_width: int = 80,
+    map_height: int = 43,
+    room_max_size: int = 10,
+    room_min_size: int = 6,
+    max_rooms: int = 30,
+    message_archive_path: str | None = None,
+    pregenerate_floors: bool = False,
+) -> Engine:
+    """Return a brand new game session as an Engine instance.
 
-    player = copy.deepcopy(entity_factories.player)
+    Older messages are spilled to message_archive_path if given, otherwise
+    only the most recent ones are kept. With pregenerate_floors the next
+    floor down is generated in a worker process while this one is played.
+    """
+    player = entity_factories.player.build()
 
-    engine = Engine(player=player)
+    engine = Engine(player=player, message_archive_path=message_archive_path)
 
     engine.game_world = GameWorld(
         engine=engine,
@@ -39,15 +52,17 @@ def new_game() -> Engine:
         room_max_size=room_max_size,
         map_width=map_width,
         map_height=map_height,
+        pregenerate=pregenerate_floors,
     )
 
     engine.game_world.generate_floor()
+    engine.game_world.pregenerate_next_floor()
     engine.update_fov()
 
     engine.message_log.add_message('Hello and welcome, adventurer, to yet another dungeon!', colour.welcome_text)
 
-    dagger = copy.deepcopy(entity_factories.dagger)
-    leather_armour = copy.deepcopy(entity_factories.leather_armour)
+    dagger = entity_factories.dagger.build()
+    leather_armour = entity_factories.leather_armour.build()
 
     dagger.parent = player.inventory
     leather_armour.parent = player.inventory
@@ -61,11 +76,20 @@ def new_game() -> Engine:
     return engine
 
 
-def load_game(filename: str) -> Engine:
-    """Load an Engine instance from a file."""
+def load_game(filename: str, *, pregenerate_floors: bool = True) -> Engine:
+    """Load an Engine instance from a file.
+
+    Unless pregenerate_floors is False, the next floor down starts being
+    generated in a worker process if the saved game does that.
+    """
     with open(filename, 'rb') as f:
-        engine = pickle.loads(lzma.decompress(f.read()))
+        engine = pickle.loads(save_codecs.decode(f.read()))
+    if isinstance(engine, dict):
+        # A journal snapshot, bring it up to date from its journal
+        engine = journal.restore(engine, filename)
     assert isinstance(engine, Engine)
+    if pregenerate_floors:
+        engine.game_world.pregenerate_next_floor()
     return engine
 
 
@@ -74,7 +98,7 @@ class MainMenu(input_handlers.BaseEventHandler):
 
     def on_render(self, console: tcod.Console) -> None:
         """Render the main menu on a background image."""
-        console.draw_semigraphics(background_image, 0, 0)
+        console.draw_semigraphics(get_background_image(), 0, 0)
 
         console.print(
             console.width // 2,
@@ -115,6 +139,8 @@ class MainMenu(input_handlers.BaseEventHandler):
                 traceback.print_exc()  # Print to stderr
                 return input_handlers.PopupMessage(self, f'Failed to load game:\n {exc}')
         elif event.sym == tcod.event.K_n:
-            return input_handlers.MainGameEventHandler(new_game())
+            return input_handlers.MainGameEventHandler(
+                new_game(message_archive_path=new_archive_path('savegame.sav'), pregenerate_floors=True)
+            )
 
         return None
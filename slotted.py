@@ -0,0 +1,50 @@
+"""
+Base class for the slotted classes the game keeps thousands of
+
+Entities, their components and AIs declare __slots__ rather than
+carrying a __dict__ each. Subclassing Slotted also pickles them as the
+classes tuple of slot names and a tuple of their values. The names
+tuple is the same object for every instance of a class, so a save only
+spells it out once and refers back to it after that, rather than
+repeating the attribute names for every entity. Values are matched back
+up by name, so adding, removing or reordering slots can't load a save
+with its fields swapped.
+
+Loading sets the slots with object.__setattr__, skipping any __setattr__
+of the class. A property over a slot, like Actor.x over Entity.x, is
+still used, and must cope with the slots after it not being loaded yet
+(see Actor.write_column).
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Any, Tuple
+
+# Stands in for a slot that hasn't been set, Ellipsis pickles by reference
+UNSET = ...
+
+# Slot names, then the value of each
+SlotState = Tuple[Tuple[str, ...], Tuple[Any, ...]]
+
+
+@functools.cache
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """Every slot of a class, from its bases down"""
+    return tuple(name for klass in reversed(cls.__mro__) for name in klass.__dict__.get('__slots__', ()))
+
+
+class Slotted:
+    __slots__ = ()
+
+    def __getstate__(self) -> SlotState:
+        names = slot_names(type(self))
+        return names, tuple(getattr(self, name, UNSET) for name in names)
+
+    def __setstate__(self, state: SlotState) -> None:
+        names, values = state
+        slots = slot_names(type(self))
+        for name, value in zip(names, values):
+            # Slots saved but since removed are dropped, ones added since stay unset
+            if value is not UNSET and name in slots:
+                object.__setattr__(self, name, value)
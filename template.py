@@ -0,0 +1,56 @@
+"""
+Templates the entities in entity_factories are built from
+
+A Template stores a class and the arguments to construct it with.
+Arguments that are themselves Templates, like an Actor's Fighter, are
+built fresh each time, so every entity built gets its own components
+while everything else (names, colours, AI classes) is shared as is and
+must not be changed in place.
+
+The arguments are sorted into shared values and nested templates when the
+template is made, so building one is just the constructor calls rather
+than a deep copy walking the whole component graph of a prototype.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Generic, List, Tuple, Type, TypeVar
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+
+T = TypeVar('T')
+
+
+class Template(Generic[T]):
+    def __init__(self, cls: Type[T], **kwargs: Any):
+        self.cls = cls
+        self.kwargs = kwargs
+
+        # Split once here so build only has to construct the nested templates
+        self.shared: Dict[str, Any] = {}
+        self.nested: List[Tuple[str, Template[Any]]] = []
+        for name, value in kwargs.items():
+            if isinstance(value, Template):
+                self.nested.append((name, value))
+            else:
+                self.shared[name] = value
+
+    def __repr__(self) -> str:
+        return f'Template({self.cls.__name__}, {self.kwargs!r})'
+
+    def build(self, **overrides: Any) -> T:
+        """Construct a new instance, with any arguments in overrides replaced"""
+        kwargs = dict(self.shared)
+        for name, template in self.nested:
+            if name not in overrides:
+                kwargs[name] = template.build()
+        kwargs.update(overrides)
+        return self.cls(**kwargs)
+
+    def spawn(self, gamemap: GameMap, x: int, y: int) -> T:
+        """Build a new entity and add it to the map at the location"""
+        entity = self.build(x=x, y=y)
+        entity.parent = gamemap  # type: ignore[attr-defined]
+        gamemap.add_entity(entity)  # type: ignore[arg-type]
+        return entity
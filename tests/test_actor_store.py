@@ -0,0 +1,153 @@
+import pickle
+from typing import Tuple
+
+import numpy as np
+
+import actions
+import entity_factories
+import setup_game
+from components.ai import DIRECTIONS
+from engine import Engine
+from entity import Actor
+from game_map import GameMap
+
+
+def assert_store_matches(game_map: GameMap) -> None:
+    """Every actor on the map has its own row, and the map agrees with the row about where it is"""
+    store = game_map.actor_store
+    actors = {entity for entity in game_map.entities if isinstance(entity, Actor)}
+
+    assert {actor for actor in store.actors if actor is not None} == actors
+    assert store.in_use.sum() == len(store) == len(actors)
+    for actor in actors:
+        row = actor.row
+        assert actor.store is store and store.actors[row] is actor and store.in_use[row]
+        fighter = actor.fighter
+        assert (actor.x, actor.y) == (store.x[row], store.y[row])
+        assert (fighter.hp, fighter.max_hp) == (store.hp[row], store.max_hp[row])
+        assert (fighter.base_defense, fighter.base_power) == (store.base_defense[row], store.base_power[row])
+        assert store.alive[row] == actor.is_alive
+        assert actor in game_map.get_entities_at_location(actor.x, actor.y)
+
+    assert set(game_map.actors) == {actor for actor in actors if actor.is_alive}
+
+    occupancy = np.zeros_like(game_map.occupancy)
+    for entity in game_map.entities:
+        if entity.blocks_movement:
+            occupancy[entity.x, entity.y] += 1
+    assert (game_map.occupancy == occupancy).all()
+
+
+def free_direction(engine: Engine) -> Tuple[int, int]:
+    """A direction the player can step in"""
+    player = engine.player
+    for dx, dy in DIRECTIONS:
+        if not engine.game_map.blocked[player.x + dx, player.y + dy]:
+            return dx, dy
+    raise AssertionError('No room beside the player')
+
+
+def orc_beside_player(engine: Engine) -> Actor:
+    dx, dy = free_direction(engine)
+    return entity_factories.orc.spawn(engine.game_map, engine.player.x + dx, engine.player.y + dy)
+
+
+def test_columns_after_damage() -> None:
+    engine = setup_game.new_game()
+    game_map = engine.game_map
+    orc = orc_beside_player(engine)
+    game_map.track_changes()
+
+    orc.fighter.take_damage(3)
+    assert game_map.actor_store.hp[orc.row] == orc.fighter.hp == 7
+    # Flagged for the journal
+    changes = game_map.track_changes()
+    assert changes is not None and orc in changes.entities
+
+    # Many at once, written over the rows together
+    others = [orc_beside_player(engine) for _ in range(2)]
+    assert game_map.actor_store.damage([orc, *others], 4) == []
+    assert [actor.fighter.hp for actor in (orc, *others)] == [3, 6, 6]
+    changes = game_map.track_changes()
+    assert changes is not None and {orc, *others} <= changes.entities
+    assert_store_matches(game_map)
+
+
+def test_columns_after_death() -> None:
+    engine = setup_game.new_game()
+    game_map = engine.game_map
+    orc = orc_beside_player(engine)
+    row = orc.row
+
+    assert game_map.actor_store.damage([orc], 100) == [orc]
+    assert orc.fighter.hp == 0 and not orc.is_alive
+    # Corpses keep their row, they're still on the map
+    assert orc.row == row and not game_map.actor_store.alive[row]
+    assert orc not in set(game_map.actors)
+    assert_store_matches(game_map)
+
+
+def test_columns_after_move() -> None:
+    engine = setup_game.new_game()
+    game_map = engine.game_map
+    player = engine.player
+    row = player.row
+
+    dx, dy = free_direction(engine)
+    start = player.x, player.y
+    actions.MovementAction(player, dx, dy).perform()
+    assert (player.x, player.y) == (start[0] + dx, start[1] + dy)
+    # Moving writes the new position into the same row
+    assert player.row == row
+    assert_store_matches(game_map)
+
+
+def test_columns_after_floor_change() -> None:
+    engine = setup_game.new_game()
+    first_map = engine.game_map
+    player = engine.player
+    orc = orc_beside_player(engine)
+    orc.fighter.take_damage(4)
+    player.fighter.take_damage(5)
+    player.fighter.base_power += 2
+    old_row = player.row
+
+    player.place(*first_map.downstairs_location)
+    actions.TakeStairsAction(player).perform()
+    second_map = engine.game_map
+    assert second_map is not first_map
+
+    # The row on the floor left is given back, the values come along
+    assert not first_map.actor_store.in_use[old_row] and first_map.actor_store.actors[old_row] is None
+    assert player.store is second_map.actor_store
+    assert (player.fighter.hp, player.fighter.base_power) == (25, 4)
+    assert_store_matches(second_map)
+
+    # Back up, the floor comes out of the cache with its store
+    player.place(*second_map.upstairs_location)
+    actions.TakeStairsAction(player).perform()
+    restored = engine.game_map
+    restored_orc = next(actor for actor in restored.actors if actor.name == 'Orc' and actor.fighter.hp == 6)
+    assert restored_orc.store is restored.actor_store
+    assert_store_matches(restored)
+
+
+def test_columns_after_pickling() -> None:
+    engine = setup_game.new_game()
+    orc = orc_beside_player(engine)
+    orc.fighter.take_damage(4)
+
+    loaded: Engine = pickle.loads(pickle.dumps(engine))  # noqa: S301
+    assert_store_matches(loaded.game_map)
+    assert loaded.player.store is loaded.game_map.actor_store
+    assert sorted(actor.fighter.hp for actor in loaded.game_map.actors) == sorted(
+        actor.fighter.hp for actor in engine.game_map.actors
+    )
+
+
+def test_off_map_actor_keeps_its_values() -> None:
+    orc = entity_factories.orc.build(x=3, y=4)
+    assert orc.store is None
+    orc.fighter.hp -= 2
+    orc.x += 1
+    assert (orc.x, orc.y, orc.fighter.hp) == (4, 4, 8)
@@ -0,0 +1,43 @@
+import tcod
+
+import entity_factories
+import render_functions
+import setup_game
+from input_handlers import LookHandler, MainGameEventHandler
+
+
+def printed(console: tcod.console.Console, x: int, y: int) -> str:
+    return ''.join(chr(ch) for ch in console.ch[x:, y]).strip()
+
+
+def test_mouse_follows_the_camera() -> None:
+    engine = setup_game.new_game(map_width=200, map_height=120)
+    game_map = engine.game_map
+    game_map.visible[:] = True
+    camera = engine.camera
+    camera.centre_on(40, 21, game_map)
+
+    MainGameEventHandler(engine).ev_mousemotion(tcod.event.MouseMotion(tile=tcod.event.Point(10, 10)))
+    assert engine.mouse_location == (10, 10)
+
+    # The camera scrolls without the mouse moving, the tile under it is now this one
+    camera.centre_on(120, 60, game_map)
+    x, y = camera.screen_to_map(10, 10)
+    entity_factories.orc.spawn(game_map, x, y)
+
+    console = tcod.console.Console(80, 50, order='F')
+    render_functions.render_names_at_mouse_location(console, 0, 0, engine)
+    assert printed(console, 0, 0) == 'Orc'
+
+
+def test_cursor_starts_on_player_and_stays_in_view() -> None:
+    engine = setup_game.new_game(map_width=200, map_height=120)
+    player = engine.player
+    engine.camera.centre_on(player.x, player.y, engine.game_map)
+
+    handler = LookHandler(engine)
+    assert handler.cursor == (player.x, player.y)
+
+    # Off the map part of the console, like the message log
+    engine.mouse_location = (10, 45)
+    assert engine.camera.in_view(*handler.cursor)
@@ -0,0 +1,42 @@
+import io
+
+import dungeon_stats
+
+
+def sample(floor: int, stair_distance: int | None) -> dict:
+    return {
+        'seed': 0,
+        'floor': floor,
+        'rooms': 5,
+        'coverage': 0.25,
+        'monsters': 2,
+        'items': 1,
+        'stair_distance': stair_distance,
+    }
+
+
+def test_unreachable_stairs_left_out_of_distance() -> None:
+    summary = dungeon_stats.aggregate([sample(1, 10), sample(1, None), sample(2, 30), sample(2, None), sample(2, None)])
+
+    distance = summary['all']['stair_distance']
+    assert (distance['mean'], distance['min'], distance['max'], distance['missing']) == (20, 10, 30, 3)
+    assert sum(distance['histogram'].values()) == 2
+    assert summary['1']['stair_distance']['missing'] == 1
+    assert summary['all']['rooms']['missing'] == 0
+
+
+def test_floor_with_no_reachable_stairs() -> None:
+    summary = dungeon_stats.aggregate([sample(1, None)])
+
+    distance = summary['1']['stair_distance']
+    assert (distance['mean'], distance['min'], distance['max'], distance['missing']) == (None, None, None, 1)
+
+    output = io.StringIO()
+    dungeon_stats.write_csv(summary, output)
+    assert '1,stair_distance,missing,1' in output.getvalue()
+
+
+def test_sample_floor_reaches_stairs() -> None:
+    settings = {'map_width': 80, 'map_height': 43, 'max_rooms': 30, 'room_min_size': 6, 'room_max_size': 10}
+    result = dungeon_stats.sample_floor(settings, seed=1, floor=2)
+    assert result['stair_distance'] is not None and result['stair_distance'] > 0
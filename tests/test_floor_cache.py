@@ -0,0 +1,144 @@
+import io
+import os
+import pickle
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pytest
+
+import actions
+import setup_game
+from engine import Engine
+from floor_cache import FloorCache, FloorUnpickler, dump_floor, load_floor
+
+
+def floor_contents(engine: Engine) -> Tuple[np.ndarray, Any]:
+    """What a floor looks like apart from the player"""
+    game_map = engine.game_map
+    entities = sorted((entity.name, entity.x, entity.y) for entity in game_map.entities if entity is not engine.player)
+    return game_map.tiles.copy(), entities
+
+
+def descend(engine: Engine, floors: int) -> Dict[int, Tuple[np.ndarray, Any]]:
+    """Go down some floors, returning what each floor left looked like"""
+    left = {}
+    for _ in range(floors):
+        left[engine.game_world.current_floor] = floor_contents(engine)
+        engine.player.place(*engine.game_map.downstairs_location)
+        actions.TakeStairsAction(engine.player).perform()
+    return left
+
+
+def climb_and_compare(engine: Engine, left: Dict[int, Tuple[np.ndarray, Any]]) -> None:
+    """Go back up to the first floor, checking each is as it was left"""
+    game_world = engine.game_world
+    while game_world.current_floor > 1:
+        engine.player.place(*engine.game_map.upstairs_location)
+        actions.TakeStairsAction(engine.player).perform()
+
+        tiles, entities = left[game_world.current_floor]
+        assert (engine.game_map.tiles == tiles).all()
+        assert floor_contents(engine)[1] == entities
+        assert engine.game_map.engine is engine
+        assert (engine.player.x, engine.player.y) == engine.game_map.downstairs_location
+        assert engine.player in engine.game_map.entities
+
+
+def in_memory(cache: FloorCache) -> Dict[int, bool]:
+    return {floor: blob is not None for floor, blob in cache.floors.items()}
+
+
+def test_evicts_least_recently_used_past_max_in_memory(tmp_path: Path) -> None:
+    engine = setup_game.new_game()
+    cache = engine.game_world.floors = FloorCache(max_in_memory=2, memory_budget=10**9, directory=str(tmp_path))
+    descend(engine, 5)
+
+    assert in_memory(cache) == {1: False, 2: False, 3: False, 4: True, 5: True}
+    assert sorted(os.listdir(tmp_path)) == ['floor-1.sav', 'floor-2.sav', 'floor-3.sav']
+    assert cache.memory == sum(len(blob) for blob in cache.floors.values() if blob is not None)
+
+
+def test_evicts_past_memory_budget(tmp_path: Path) -> None:
+    engine = setup_game.new_game()
+    cache = engine.game_world.floors = FloorCache(max_in_memory=10, memory_budget=0, directory=str(tmp_path))
+    descend(engine, 3)
+
+    assert in_memory(cache) == {1: False, 2: False, 3: False}
+    assert cache.memory == 0
+
+    # One byte short of the newest floor, then just enough for it
+    size = len(dump_floor(engine.game_map, cache.codec))
+    cache.memory_budget = size - 1
+    cache.store(4, engine.game_map)
+    assert in_memory(cache) == {1: False, 2: False, 3: False, 4: False}
+    cache.memory_budget = size
+    cache.store(4, engine.game_map)
+    assert in_memory(cache) == {1: False, 2: False, 3: False, 4: True}
+    assert cache.memory == size
+
+
+def test_floors_reload_from_disk(tmp_path: Path) -> None:
+    engine = setup_game.new_game()
+    cache = engine.game_world.floors = FloorCache(max_in_memory=1, directory=str(tmp_path))
+    left = descend(engine, 4)
+
+    climb_and_compare(engine, left)
+    # Each floor is taken out of the cache as it's visited, then the one
+    # below stored as the player leaves it
+    assert set(cache.floors) == {2, 3, 4, 5}
+    assert not (tmp_path / 'floor-1.sav').exists()
+
+
+def test_getstate_pulls_floors_back_from_disk(tmp_path: Path) -> None:
+    engine = setup_game.new_game()
+    cache = engine.game_world.floors = FloorCache(max_in_memory=1, directory=str(tmp_path))
+    descend(engine, 4)
+    assert not all(in_memory(cache).values())
+
+    state = cache.__getstate__()
+    assert all(blob is not None for blob in state['floors'].values())
+    assert state['floors'] == {floor: cache.read(floor) for floor in cache.floors}
+    assert state['memory'] == sum(len(blob) for blob in state['floors'].values())
+    # The live cache is left as it was
+    assert not all(in_memory(cache).values())
+
+
+def test_save_stands_on_its_own(tmp_path: Path) -> None:
+    engine = setup_game.new_game()
+    cache = engine.game_world.floors = FloorCache(max_in_memory=1)
+    left = descend(engine, 4)
+    path = str(tmp_path / 'savegame.sav')
+    engine.save_as(path)
+
+    # As if loaded by a new process, after the old temporary directory went
+    old_directory = cache.temporary_directory
+    assert old_directory is not None
+    shutil.rmtree(old_directory)
+
+    loaded = setup_game.load_game(path, pregenerate_floors=False)
+    loaded_cache = loaded.game_world.floors
+    assert loaded_cache.temporary_directory not in (None, old_directory)
+    assert in_memory(loaded_cache) == in_memory(cache)
+    climb_and_compare(loaded, left)
+
+
+def test_persistent_ids_restore_live_engine_and_player() -> None:
+    engine = setup_game.new_game()
+    game_map = engine.game_map
+
+    loaded = load_floor(dump_floor(game_map, 'zlib'), engine)
+    assert loaded is not game_map
+    assert loaded.engine is engine
+    assert engine.player in loaded.entities
+    assert sum(entity is engine.player for entity in loaded.entities) == 1
+    # Everything else on the floor is a new copy
+    assert all(entity.parent is loaded for entity in loaded.entities if entity is not engine.player)
+    assert not set(map(id, loaded.entities)) & set(map(id, game_map.entities - {engine.player}))
+
+
+def test_unknown_persistent_id() -> None:
+    engine = setup_game.new_game()
+    with pytest.raises(pickle.UnpicklingError):
+        FloorUnpickler(io.BytesIO(), engine).persistent_load('other')
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import tcod
+
+import fov
+
+
+def random_map(rng: np.random.Generator) -> np.ndarray:
+    width, height = rng.integers(10, 40, 2)
+    return rng.random((width, height)) > 0.25
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_rays_symmetric(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    transparency = random_map(rng)
+    width, height = transparency.shape
+    x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+    radius = int(rng.integers(1, 10))
+
+    visible = fov.ray_fov(transparency, (x, y), radius)
+    assert visible[x, y]
+    for other_x, other_y in np.argwhere(visible).tolist():
+        assert fov.ray_fov(transparency, (other_x, other_y), radius)[x, y]
+
+
+@pytest.mark.parametrize('radius', [1, 4, 8])
+def test_rays_match_tcod_in_open_room(radius: int) -> None:
+    transparency = np.ones((40, 30), dtype=bool)
+    for pov in [(20, 15), (0, 0), (39, 3)]:
+        expected = tcod.map.compute_fov(transparency, pov, radius=radius)
+        assert (fov.compute(transparency, pov, radius, 'rays') == expected).all()
+
+
+def test_batch_matches_single_viewers() -> None:
+    rng = np.random.default_rng(0)
+    transparency = random_map(rng)
+    width, height = transparency.shape
+    povs = rng.integers(0, [width, height], (6, 2))
+    radii = rng.integers(1, 8, 6)
+    radius = int(radii.max())
+
+    windows = fov.batch(transparency, povs, radii)
+    for window, (x, y), viewer_radius in zip(windows, povs.tolist(), radii.tolist()):
+        padded = np.zeros((width + 2 * radius, height + 2 * radius), dtype=bool)
+        padded[x : x + 2 * radius + 1, y : y + 2 * radius + 1] = window
+        assert (padded[radius:-radius, radius:-radius] == fov.ray_fov(transparency, (x, y), viewer_radius)).all()
+
+
+def test_rays_reject_unlimited_radius() -> None:
+    with pytest.raises(ValueError):
+        fov.compute(np.ones((10, 10), dtype=bool), (5, 5), 0, 'rays')
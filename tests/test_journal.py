@@ -0,0 +1,164 @@
+import os
+import pickle
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+import actions
+import exceptions
+import journal
+import save_codecs
+import setup_game
+from components.ai import DIRECTIONS
+from engine import Engine
+from entity import Actor, Entity
+
+
+def play_turn(engine: Engine, rng: np.random.Generator) -> None:
+    """Have the player do something random, then let the enemies act"""
+    player = engine.player
+    roll = rng.random()
+    if roll < 0.7:
+        action: actions.Action = actions.BumpAction(player, *DIRECTIONS[rng.integers(len(DIRECTIONS))])
+    elif roll < 0.8:
+        action = actions.PickupAction(player)
+    elif roll < 0.85 and player.inventory.items:
+        action = actions.DropItem(player, player.inventory.items[rng.integers(len(player.inventory.items))])
+    elif roll < 0.87:
+        if rng.random() < 0.1:
+            player.place(*engine.game_map.downstairs_location)
+        action = actions.TakeStairsAction(player)
+    elif roll < 0.93 and player.inventory.items:
+        item = player.inventory.items[rng.integers(len(player.inventory.items))]
+        if item.consumable:
+            target = player.x + int(rng.integers(-3, 4)), player.y + int(rng.integers(-3, 4))
+            action = actions.ItemAction(player, item, target)
+        else:
+            action = actions.EquipAction(player, item)
+    else:
+        action = actions.WaitAction(player)
+
+    try:
+        action.perform()
+    except exceptions.Impossible:
+        return
+    engine.handle_enemy_turns()
+    engine.update_fov()
+
+
+def save(save_journal: journal.SaveJournal, engine: Engine) -> str:
+    pending = save_journal.record(engine)
+    pending.encode()
+    pending.commit()
+    return 'snapshot' if isinstance(pending, journal.JournalSnapshot) else 'append'
+
+
+def restore(path: str) -> Tuple[Engine, List[Entity]]:
+    with open(path, 'rb') as f:
+        data = pickle.loads(save_codecs.decode(f.read()))  # noqa: S301
+    return journal.restore(data, path), data['registry']
+
+
+def assert_same(live: Engine, save_journal: journal.SaveJournal, path: str) -> None:
+    restored, registry = restore(path)
+    assert restored.turn == live.turn
+
+    # Every entity the journal knows of, HP, inventories and AI included
+    ids = {entity: i for i, entity in enumerate(registry)}
+    for live_entity, restored_entity in zip(save_journal.registry, registry, strict=True):
+        assert journal.entity_state(restored_entity, ids, restored.game_map) == journal.entity_state(
+            live_entity, save_journal.ids, live.game_map
+        )
+        if isinstance(live_entity, Actor):
+            assert restored_entity.fighter.hp == live_entity.fighter.hp
+            assert [item.name for item in restored_entity.inventory.items] == [
+                item.name for item in live_entity.inventory.items
+            ]
+
+    live_map, restored_map = live.game_map, restored.game_map
+    assert (restored_map.tiles == live_map.tiles).all()
+    assert (restored_map.explored == live_map.explored).all()
+    assert (restored_map.occupancy == live_map.occupancy).all()
+    assert (restored_map.visible == live_map.visible).all()
+    assert sorted((entity.name, entity.x, entity.y) for entity in restored_map.entities) == sorted(
+        (entity.name, entity.x, entity.y) for entity in live_map.entities
+    )
+
+    def messages(engine: Engine) -> List[Tuple[str, int]]:
+        return [(message.plain_text, message.count) for message in reversed(engine.message_log.history())]
+
+    assert messages(restored) == messages(live)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_restore_matches_live_game(tmp_path: Path, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    path = str(tmp_path / 'savegame.sav')
+    engine = setup_game.new_game(message_archive_path=str(tmp_path / 'savegame.sav.log'))
+    # Keep the player alive and the message log spilling to its archive
+    engine.player.fighter.base_defense = 100
+    engine.message_log.capacity = 16
+    save_journal = journal.SaveJournal(path, compact_every=7)
+
+    kinds = []
+    for turn in range(600):
+        play_turn(engine, rng)
+        if turn % 3 == 0:
+            kinds.append(save(save_journal, engine))
+        if turn % 30 == 0:
+            assert_same(engine, save_journal, path)
+    kinds.append(save(save_journal, engine))
+    assert_same(engine, save_journal, path)
+
+    # Both deltas and compactions were exercised
+    assert 'append' in kinds and kinds.count('snapshot') > 2
+
+    loaded = setup_game.load_game(path, pregenerate_floors=False)
+    assert (loaded.player.x, loaded.player.y, loaded.player.fighter.hp) == (
+        engine.player.x,
+        engine.player.y,
+        engine.player.fighter.hp,
+    )
+
+
+def test_partial_record_ignored(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'savegame.sav')
+    engine = setup_game.new_game()
+    save_journal = journal.SaveJournal(path)
+    save(save_journal, engine)
+    for _ in range(3):
+        play_turn(engine, rng)
+        save(save_journal, engine)
+    complete = engine.turn
+
+    # A record cut short by a crash mid write
+    play_turn(engine, rng)
+    pending = save_journal.record(engine)
+    pending.encode()
+    with open(journal.journal_path(path), 'ab') as f:
+        f.write(pending.data[: len(pending.data) // 2])
+
+    assert restore(path)[0].turn == complete
+
+
+def test_journal_of_other_snapshot_ignored(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'savegame.sav')
+    engine = setup_game.new_game()
+    save_journal = journal.SaveJournal(path)
+    save(save_journal, engine)
+    snapshot_turn = engine.turn
+    with open(journal.journal_path(path), 'rb') as f:
+        token = f.read()
+
+    for _ in range(3):
+        play_turn(engine, rng)
+        save(save_journal, engine)
+
+    # Write the journal back under another token
+    with open(journal.journal_path(path), 'r+b') as f:
+        f.write(os.urandom(len(token)))
+    assert restore(path)[0].turn == snapshot_turn
@@ -0,0 +1,73 @@
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import exceptions
+import message_log
+import setup_game
+from input_handlers import GameOverEventHandler
+from message_log import MessageLog
+
+
+def texts(messages) -> List[str]:
+    return [message.full_text for message in messages]
+
+
+def test_spills_to_archive(tmp_path: Path) -> None:
+    log = MessageLog(capacity=8, archive_path=str(tmp_path / 'game.log'))
+    for i in range(20):
+        log.add_message(f'Message {i}')
+
+    assert len(log.messages) <= 8
+    assert len(log.archive) + len(log.messages) == len(log) == 20
+    assert texts(log.archive.read(0, len(log.archive))) == [f'Message {i}' for i in range(len(log.archive))]
+
+
+def test_spilled_messages_dropped_without_archive() -> None:
+    log = MessageLog(capacity=8)
+    for i in range(20):
+        log.add_message(f'Message {i}')
+
+    assert len(log) == len(log.messages) <= 8
+    assert texts(reversed(log.history())) == [f'Message {i}' for i in reversed(range(20 - len(log), 20))]
+
+
+@pytest.mark.parametrize('stop', [0, 1, 5, 13, 20, 37, 40])
+def test_history_reversed_in_order(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, stop: int) -> None:
+    # Small chunks so paging back crosses several reads
+    monkeypatch.setattr(message_log, 'ARCHIVE_READ_CHUNK', 3)
+    log = MessageLog(capacity=8, archive_path=str(tmp_path / 'game.log'))
+    for i in range(40):
+        log.add_message(f'Message {i}')
+        # Stacked counts are kept through the archive
+        if i % 7 == 0:
+            log.add_message(f'Message {i}')
+
+    expected = [f'Message {i}' + (' (x2)' if i % 7 == 0 else '') for i in range(stop)]
+    assert texts(reversed(log.history(stop))) == expected[::-1]
+
+
+def test_history_stops_at_missing_archive(tmp_path: Path) -> None:
+    log = MessageLog(capacity=8, archive_path=str(tmp_path / 'game.log'))
+    for i in range(20):
+        log.add_message(f'Message {i}')
+    os.remove(log.archive_path)
+
+    assert texts(reversed(log.history())) == texts(reversed(log.messages))
+
+
+def test_game_over_removes_archive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    archive_path = message_log.new_archive_path('savegame.sav')
+    engine = setup_game.new_game(message_archive_path=archive_path)
+    engine.message_log.capacity = 4
+    for i in range(10):
+        engine.message_log.add_message(f'Message {i}')
+    engine.save_as('savegame.sav')
+    assert os.path.exists(archive_path)
+
+    with pytest.raises(exceptions.QuitWithoutSaving):
+        GameOverEventHandler(engine).on_quit()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,26 @@
+import pytest
+
+import setup_game
+import tile_types
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_up_stairs_survive_tunnels(seed: int) -> None:
+    engine = setup_game.new_game()
+    game_world = engine.game_world
+    game_world.seed = seed
+    game_world.generate_floor()
+
+    game_map = engine.game_map
+    assert game_world.current_floor == 2
+    assert game_map.upstairs_location is not None
+    assert game_map.tiles[game_map.upstairs_location] == tile_types.up_stairs
+
+
+def test_down_stairs_in_only_room() -> None:
+    engine = setup_game.new_game(max_rooms=1)
+
+    game_map = engine.game_map
+    assert len(game_map.rooms) == 1
+    assert game_map.downstairs_location == game_map.rooms[0].center
+    assert game_map.tiles[game_map.downstairs_location] == tile_types.down_stairs
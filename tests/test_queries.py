@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import entity_factories
+import queries
+import setup_game
+from engine import Engine
+
+
+def crowded_engine(rng: np.random.Generator) -> Engine:
+    """A new game with orcs spread over random walkable tiles"""
+    engine = setup_game.new_game()
+    game_map = engine.game_map
+    walkable_x, walkable_y = np.nonzero(game_map.walkable)
+    for i in rng.integers(0, len(walkable_x), 300).tolist():
+        entity_factories.orc.spawn(game_map, int(walkable_x[i]), int(walkable_y[i]))
+    # Some dead, which neither query should return
+    for actor in rng.choice(list(game_map.actors), 30, replace=False):
+        if actor is not engine.player:
+            actor.fighter.die()
+    game_map.visible[:] = rng.random(game_map.visible.shape) > 0.3
+    return engine
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_actors_within_matches_distance_loop(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    engine = crowded_engine(rng)
+    game_map = engine.game_map
+    for _ in range(50):
+        x, y = int(rng.integers(game_map.width)), int(rng.integers(game_map.height))
+        radius = float(rng.choice([1, 2, 3, 4.5, 6]))
+        expected = {actor for actor in game_map.actors if actor.distance(x, y) <= radius}
+        assert set(queries.actors_within(game_map, x, y, radius)) == expected
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_nearest_visible_actor_matches_distance_loop(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    engine = crowded_engine(rng)
+    game_map = engine.game_map
+    for actor in rng.choice(list(game_map.actors), 50, replace=False):
+        max_range = int(rng.choice([1, 3, 5, 8]))
+
+        closest = None
+        closest_distance = max_range + 1.0
+        for other in game_map.actors:
+            if other is not actor and game_map.visible[other.x, other.y]:
+                distance = actor.distance(other.x, other.y)
+                if distance < closest_distance:
+                    closest, closest_distance = other, distance
+
+        found = queries.nearest_visible_actor(game_map, actor.x, actor.y, max_range, exclude=actor)
+        if closest is None:
+            assert found is None
+        else:
+            # Ties may pick a different actor, at the same distance
+            assert found is not None and found is not actor
+            assert actor.distance(found.x, found.y) == closest_distance
+
+
+def test_blast_cells_are_the_tiles_within_radius() -> None:
+    engine = crowded_engine(np.random.default_rng(0))
+    game_map = engine.game_map
+    for x, y in [(0, 0), (10, 10), (game_map.width - 1, game_map.height - 2)]:
+        cells_x, cells_y = queries.blast_cells(game_map, x, y, 3)
+        all_x, all_y = np.indices(game_map.tiles.shape)
+        expected = (all_x - x) ** 2 + (all_y - y) ** 2 <= 9
+        found = np.zeros_like(expected)
+        found[cells_x, cells_y] = True
+        assert (found == expected).all()
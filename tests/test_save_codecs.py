@@ -0,0 +1,86 @@
+import lzma
+import os
+import pickle
+import stat
+from pathlib import Path
+
+import pytest
+
+import save_codecs
+import setup_game
+
+DATA = b'A save file, long enough to compress a little. ' * 64
+
+
+@pytest.mark.parametrize('name', list(save_codecs.CODECS))
+def test_round_trip_every_codec(name: str) -> None:
+    default_level = save_codecs.CODECS[name][2]
+    for codec in (name, f'{name}:{default_level}'):
+        blob = save_codecs.encode(DATA, codec)
+        assert save_codecs.split_header(blob)[0] == f'{name}:{default_level}'
+        assert save_codecs.decode(blob) == DATA
+
+
+@pytest.mark.parametrize('codec', ['zlib:1', 'zlib:9', 'bz2:1', 'lzma:0', 'lzma:9'])
+def test_round_trip_levels(codec: str) -> None:
+    blob = save_codecs.encode(DATA, codec)
+    assert save_codecs.split_header(blob)[0] == codec
+    assert save_codecs.decode(blob) == DATA
+
+
+def test_save_without_header_is_lzma() -> None:
+    assert save_codecs.decode(lzma.compress(DATA)) == DATA
+
+
+def test_load_game_without_header(tmp_path: Path) -> None:
+    engine = setup_game.new_game()
+    path = str(tmp_path / 'old.sav')
+    with open(path, 'wb') as f:
+        f.write(lzma.compress(pickle.dumps(engine)))
+
+    loaded = setup_game.load_game(path, pregenerate_floors=False)
+    assert (loaded.player.x, loaded.player.y) == (engine.player.x, engine.player.y)
+    assert (loaded.game_map.tiles == engine.game_map.tiles).all()
+
+
+@pytest.mark.parametrize('codec', ['gzip', 'zlib:fast', 'lzma:-1'])
+def test_bad_codec(codec: str) -> None:
+    with pytest.raises(ValueError, match='save codec'):
+        save_codecs.encode(DATA, codec)
+
+
+def test_codec_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv('ROGUE_SAVE_CODEC', raising=False)
+    assert save_codecs.codec_from_environment() == 'lzma'
+
+    monkeypatch.setenv('ROGUE_SAVE_CODEC', 'zlib:1')
+    assert save_codecs.codec_from_environment() == 'zlib:1'
+
+    monkeypatch.setenv('ROGUE_SAVE_CODEC', 'zstd')
+    with pytest.raises(ValueError, match='ROGUE_SAVE_CODEC'):
+        save_codecs.codec_from_environment()
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='Only read only is kept on Windows')
+def test_write_atomic_keeps_mode(tmp_path: Path) -> None:
+    path = str(tmp_path / 'game.sav')
+    with open(path, 'wb') as f:
+        f.write(b'old')
+    os.chmod(path, 0o640)
+
+    save_codecs.write_atomic(path, b'new')
+    with open(path, 'rb') as f:
+        assert f.read() == b'new'
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='Only read only is kept on Windows')
+def test_write_atomic_new_file_mode(tmp_path: Path) -> None:
+    opened = str(tmp_path / 'opened')
+    open(opened, 'wb').close()
+
+    path = str(tmp_path / 'game.sav')
+    save_codecs.write_atomic(path, b'new')
+    assert stat.S_IMODE(os.stat(path).st_mode) == stat.S_IMODE(os.stat(opened).st_mode)
+    # No temporary file left behind
+    assert sorted(os.listdir(tmp_path)) == ['game.sav', 'opened']
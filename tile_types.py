@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import List, Tuple
 
 import numpy as np
 
@@ -24,16 +24,22 @@ tile_dt = np.dtype(
 )
 
 
-# Creates Numpy array of one tile_dt element and return it
+# Every tile type defined so far, a map only stores each cells index (tile
+# id) into these as a uint8 and looks the rest up from the palette
+_palette_records: List[np.ndarray] = []
+
+
+# Creates Numpy array of one tile_dt element and adds it to the palette
 def new_tile(
     *,  # Enforce keywords, parameter order doesn't matter
     walkable: int,
     transparent: int,
     dark: Tuple[int, Tuple[int, int, int], Tuple[int, int, int]],
     light: Tuple[int, Tuple[int, int, int], Tuple[int, int, int]],
-) -> np.ndarray:
-    """Helper function for defining individual tile types"""
-    return np.array((walkable, transparent, dark, light), dtype=tile_dt)
+) -> int:
+    """Helper function for defining individual tile types, returns the new tiles id"""
+    _palette_records.append(np.array((walkable, transparent, dark, light), dtype=tile_dt))
+    return len(_palette_records) - 1
 
 
 # SHROUD is those in darkness never seen and not yet seen
@@ -62,3 +68,14 @@ down_stairs = new_tile(
     dark=(ord('>'), (0, 0, 100), (50, 50, 150)),
     light=(ord('>'), (255, 255, 255), (200, 180, 50)),
 )
+
+up_stairs = new_tile(
+    walkable=True,
+    transparent=True,
+    dark=(ord('<'), (0, 0, 100), (50, 50, 150)),
+    light=(ord('<'), (255, 255, 255), (200, 180, 50)),
+)
+
+# Palette of every tile type indexed by tile id, so whole layers are looked
+# up at once, e.g. palette['walkable'][game_map.tiles]
+palette = np.stack(_palette_records)